@@ -0,0 +1,124 @@
+"""
+Fixed-depth search benchmark for AIPlayer configurations.
+
+Every engine searches the same set of positions from an empty transposition
+table, deepening iteratively to the engine's depth, and the runner reports
+nodes, time to depth and nodes per second. Scores that differ from the first
+engine's are counted, since two exact searches of one depth must agree
+(selective searches such as late move reductions are expected to differ).
+
+With --movetime every engine instead gets that many seconds per position and
+the report shows the average depth it completes, and the plies it gains over
+the first engine, at that time per move.
+
+    python benchmark.py "hard,search=alphabeta" "hard,search=pvs"
+    python benchmark.py "medium,search=alphabeta" medium --positions 50 --fen positions.txt
+    python benchmark.py "hard,lmr=off" hard --movetime 1
+"""
+import argparse
+import random
+import time
+
+from classes.ai import AIPlayer
+from classes.board import Board
+from classes.headless import HeadlessGame, init_headless
+from classes.position import from_fen
+from tournament import parse_engine
+
+# Depth cap for --movetime searches, which otherwise stop on the clock only
+MAX_DEPTH = 40
+
+
+def build_positions(count, seed, max_random_plies=30):
+    """Positions reached by random play from the start, skipping finished games"""
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        game = HeadlessGame()
+        for _ in range(rng.randint(0, max_random_plies)):
+            if not game.play_random(rng):
+                break
+        if game.winner() is None and game.get_all_moves():
+            positions.append(game)
+    return positions
+
+
+def load_positions(path):
+    """One FEN per line; blank lines and lines starting with # are skipped"""
+    positions = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            game = HeadlessGame(Board())
+            game.turn = from_fen(game.board, line)
+            positions.append(game)
+    return positions
+
+
+def run_engine(spec, positions, movetime=None):
+    """Search every position with a fresh engine; returns per-position (score, nodes, seconds, depth).
+    With a movetime each search runs for that long instead of to the engine's depth."""
+    results = []
+    for game in positions:
+        ai = AIPlayer(game.turn, **parse_engine(spec))
+        started = time.perf_counter()
+        if movetime:
+            score, _, _ = ai.iterative_search(game, max_depth=MAX_DEPTH, budget=(float('inf'), movetime))
+        else:
+            score, _, _ = ai.iterative_search(game)
+        results.append((score, ai.nodes, time.perf_counter() - started, ai.depth_reached))
+    return results
+
+
+def print_report(specs, results, movetime=None):
+    baseline = results[specs[0]]
+    base_nodes = sum(row[1] for row in baseline)
+    base_time = sum(row[2] for row in baseline)
+    base_depth = sum(row[3] for row in baseline) / len(baseline)
+
+    if movetime:
+        print(f"\n{len(baseline)} positions at {movetime:g}s each\n")
+        print(f"{'engine':<28}{'nodes':>11}{'knps':>8}{'depth':>8}{'+plies':>8}")
+    else:
+        print(f"\n{len(baseline)} positions\n")
+        print(f"{'engine':<28}{'nodes':>11}{'x nodes':>9}{'time s':>9}{'x time':>8}{'ms/pos':>9}{'knps':>8}{'diffs':>7}")
+    for spec in specs:
+        rows = results[spec]
+        nodes = sum(row[1] for row in rows)
+        seconds = sum(row[2] for row in rows)
+        knps = nodes / seconds / 1000
+        if movetime:
+            depth = sum(row[3] for row in rows) / len(rows)
+            print(f"{spec:<28}{nodes:>11}{knps:>8.1f}{depth:>8.2f}{depth - base_depth:>+8.2f}")
+            continue
+        diffs = sum(1 for row, base in zip(rows, baseline) if row[0] != base[0])
+        print(f"{spec:<28}{nodes:>11}{nodes / base_nodes:>9.2f}{seconds:>9.2f}{seconds / base_time:>8.2f}"
+              f"{1000 * seconds / len(rows):>9.1f}{knps:>8.1f}{diffs:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare search node counts and time to depth")
+    parser.add_argument("engines", nargs="+", help="engine specs, e.g. 'hard,search=alphabeta' 'hard,search=pvs'")
+    parser.add_argument("--positions", type=int, default=30, help="random positions to search")
+    parser.add_argument("--fen", help="search the positions in this file (one FEN per line) instead")
+    parser.add_argument("--movetime", type=float, help="search each position for this many seconds and compare depths")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for spec in args.engines:
+        parse_engine(spec)
+    init_headless()
+
+    positions = load_positions(args.fen) if args.fen else build_positions(args.positions, args.seed)
+    results = {}
+    for spec in args.engines:
+        print(f"[BENCHMARK] {spec}: searching {len(positions)} positions")
+        results[spec] = run_engine(spec, positions, args.movetime)
+
+    print_report(args.engines, results, args.movetime)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,93 @@
+import json
 import random
-from .constants import ROWS, COLS, PIECE_LIGHT, PIECE_DARK
+import threading
+import time
+from .constants import ROWS, COLS, PIECE_LIGHT, PIECE_DARK, NO_PROGRESS_PLIES
+from .position import position_key, load_key
+
+# Evaluation weights: per piece, extra per king, centre, edge, far row, per capturable piece
+DEFAULT_WEIGHTS = {"piece": 10, "king": 30, "center": 5, "edge": 3, "back_row": 10, "capture": 15}
+
+def load_weights(path):
+    """Read evaluation weights from a JSON file, falling back to defaults for missing terms"""
+    with open(path) as f:
+        weights = json.load(f)
+    return {term: weights.get(term, default) for term, default in DEFAULT_WEIGHTS.items()}
+
+# Transposition table bound types, and the entry count at which it is cleared
+EXACT, LOWER, UPPER = 0, 1, 2
+TT_SIZE = 1 << 20
+
+# Clock management: expected moves left in the game, how far past its share a move
+# may run when the best move keeps changing, and the most of the clock one move may use
+MOVES_TO_GO = 20
+HARD_LIMIT_FACTOR = 3
+MAX_CLOCK_SHARE = 0.5
+
+# Search algorithms: plain alpha-beta minimax, or negamax principal variation search
+# with aspiration windows of ASPIRATION_WINDOW around the previous depth's score
+SEARCHES = ("alphabeta", "pvs")
+ASPIRATION_WINDOW = 20
+
+# Late move reductions in PVS: (from move index, plies) pairs; quiet moves that far down
+# the ordered move list are searched that much shallower first, at depths >= LMR_MIN_DEPTH
+LMR_SCHEDULE = ((3, 1), (10, 2))
+LMR_MIN_DEPTH = 3
+
+def parse_schedule(text):
+    """'3:1/10:2' -> ((3, 1), (10, 2)); 'off' or '' -> ()"""
+    if text in ("", "off", "none"):
+        return ()
+    pairs = (part.split(":") for part in text.split("/"))
+    return tuple(sorted((int(index), int(plies)) for index, plies in pairs))
+
+class SearchAborted(Exception):
+    """Raised inside minimax when a search is stopped early"""
 
 class AIPlayer:
-    def __init__(self, color, difficulty="medium"):
+    def __init__(self, color, difficulty="medium", depth=None, weights=None, ponder=False, search="pvs",
+                 lmr=LMR_SCHEDULE):
         self.color = color
+        if search not in SEARCHES:
+            raise ValueError(f"Unknown search '{search}', expected one of {SEARCHES}")
+        self.search = search
+        if isinstance(lmr, str):
+            lmr = parse_schedule(lmr)
+        self.lmr = tuple(sorted(lmr or ()))
         difficulty_map = {"easy": 1, "medium": 2, "hard": 3}
         self.difficulty = difficulty_map.get(difficulty, 2)
-        self.depth = {1: 3, 2: 5, 3: 7}[self.difficulty]
+        self.depth = depth or {1: 3, 2: 5, 3: 7}[self.difficulty]
+        if isinstance(weights, str):
+            weights = load_weights(weights)
+        self.weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+
+        # Search statistics and stop conditions
+        self.nodes = 0
+        self.depth_reached = 0
+        self.stop_event = None
+        self.deadline = None
+
+        # Repetition stack of the search: key -> times on the game history and current path,
+        # with the plies from the root and the plies since the last capture or man move
+        self.seen = {}
+        self.ply = 0
+        self.quiet = 0
+        self.no_progress_plies = NO_PROGRESS_PLIES
+
+        # Position key -> (depth, score, bound, (piece_pos, move)), kept between moves.
+        # Scores and bounds are from our point of view in both searches
+        self.tt = {}
+        self.last_pv = []
+
+        # Pondering: keep searching the predicted reply during the opponent's turn
+        self.ponder = ponder
+        self.ponder_thread = None
+        self.ponder_stop = None
+        self.ponder_result = None
 
     def evaluate_board(self, board):
         score = 0
-        capture_opportunities = 0
-        opponent_color = PIECE_LIGHT if self.color == PIECE_DARK else PIECE_DARK
+        weights = self.weights
 
         for row in range(ROWS):
             for col in range(COLS):
@@ -20,29 +96,48 @@ class AIPlayer:
                     continue
 
                 mod = 1 if piece.color == self.color else -1
-                score += mod * 10
+                score += mod * weights["piece"]
                 if piece.king:
-                    score += mod * 30
+                    score += mod * weights["king"]
 
                 # Positional bonuses
                 if row in (3, 4) and col in (3, 4):
-                    score += mod * 5
+                    score += mod * weights["center"]
                 if col in (0, 7):
-                    score += mod * 3
+                    score += mod * weights["edge"]
                 if (piece.color == PIECE_DARK and row == 0) or (piece.color == PIECE_LIGHT and row == 7):
-                    score += mod * 10
+                    score += mod * weights["back_row"]
 
-                if piece.color == self.color:
-                    moves = board.get_valid_moves(piece)
-                    for skipped in moves.values():
-                        if skipped:
-                            capture_opportunities += len(skipped) * 15
-
-        score += capture_opportunities
+        score += self.capture_bonus(board)
         return score
 
-    def get_all_moves(self, game, color=None):
+    def capture_bonus(self, board):
+        """Bonus for every piece our side could capture right now"""
+        capture_opportunities = 0
+        for piece in board.get_all_pieces(self.color):
+            for skipped in board.get_valid_moves(piece).values():
+                if skipped:
+                    capture_opportunities += len(skipped) * self.weights["capture"]
+        return capture_opportunities
+
+    def evaluate_batch(self, positions):
+        """Score (N, 32) encoded positions at once; equal to evaluate_board on each (requires NumPy)"""
+        import numpy as np
+        from .features import FEATURES, extract_features
+
+        weights = np.array([self.weights[term] for term in FEATURES], dtype=np.float64)
+        return extract_features(positions, self.color).astype(np.float64) @ weights
+
+    def get_all_moves(self, game, color=None, cached=False):
+        """Every (piece_pos, move, skipped) for a colour, captures first. The root position
+        passes cached=True to reuse the moves the board already generated for the game."""
         color = color or self.color
+        if cached:
+            valid_moves = [(piece_pos, move, skipped)
+                           for piece_pos, moves in game.board.legal_moves(color).items()
+                           for move, skipped in moves.items()]
+            valid_moves.sort(key=lambda x: len(x[2]), reverse=True)
+            return valid_moves
         valid_moves = []
         for row in range(ROWS):
             for col in range(COLS):
@@ -90,56 +185,433 @@ class AIPlayer:
                 else:
                     game.board.white_left += 1
 
-    def minimax(self, game, depth, alpha, beta, maximizing):
+    def check_stop(self):
+        if self.stop_event is not None and self.stop_event.is_set():
+            raise SearchAborted()
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            raise SearchAborted()
+
+    def start_search(self, game):
+        """Seed the repetition stack with the game's earlier positions"""
+        self.seen = {}
+        self.ply = 0
+        self.quiet = 0
+        history = getattr(game, "history", None)
+        if history is not None:
+            for key in history.keys[:-1]:
+                self.seen[key] = self.seen.get(key, 0) + 1
+            self.quiet = history.quiet_plies()
+            self.no_progress_plies = history.no_progress_plies
+
+    def is_repetition(self, key):
+        """A position already on the path or in the game, or past the no-progress limit,
+        is a draw; the root itself is always searched"""
+        return self.ply > 0 and (self.seen.get(key) or self.quiet >= self.no_progress_plies)
+
+    def enter(self, key):
+        self.seen[key] = self.seen.get(key, 0) + 1
+        self.ply += 1
+
+    def leave(self, key, quiet):
+        self.seen[key] -= 1
+        self.ply -= 1
+        self.quiet = quiet
+
+    def minimax(self, game, depth, alpha, beta, maximizing, pv=None, moves=None):
+        """Alpha-beta search; when pv is a list it is filled with the principal variation.
+        moves restricts the moves searched at this node (a capture chain at the root)."""
+        self.nodes += 1
+        if self.nodes & 1023 == 0:
+            self.check_stop()
+
         if depth == 0 or game.winner() is not None:
             return self.evaluate_board(game.board), None
 
         color = self.color if maximizing else (PIECE_LIGHT if self.color == PIECE_DARK else PIECE_DARK)
-        valid_moves = self.get_all_moves(game, color)
+        key = position_key(game.board, color)
+        if self.is_repetition(key):
+            return 0, None
+        tt_move = None
+        entry = self.tt.get(key)
+        if entry is not None:
+            tt_depth, tt_score, bound, tt_move = entry
+            # The table knows nothing of a restricted move list, so it only orders moves then
+            if moves is None and tt_depth >= depth and (bound == EXACT or (bound == LOWER and tt_score >= beta)
+                                      or (bound == UPPER and tt_score <= alpha)):
+                if pv is not None and tt_move is not None:
+                    piece = game.board.get_piece(*tt_move[0])
+                    pv[:] = [(tt_move[0], tt_move[1], game.board.get_valid_moves(piece).get(tt_move[1]))]
+                return tt_score, tt_move
+
+        valid_moves = list(moves) if moves is not None else self.get_all_moves(game, color, cached=self.ply == 0)
         if not valid_moves:
             return self.evaluate_board(game.board), None
+        if tt_move is not None:
+            # Search the move that was best last time first
+            valid_moves.sort(key=lambda m: (m[0], m[1]) != tt_move)
 
+        alpha_orig, beta_orig = alpha, beta
         best_move = None
+        quiet = self.quiet
+        self.enter(key)
         if maximizing:
             max_eval = float('-inf')
             for piece_pos, move, skipped in valid_moves:
+                child_pv = [] if pv is not None else None
+                self.quiet = 0 if skipped or not game.board.get_piece(*piece_pos).king else quiet + 1
                 piece, old_pos, was_king, skip_data = self.simulate_move(game, piece_pos, move, skipped)
-                eval_score, _ = self.minimax(game, depth - 1, alpha, beta, False)
-                self.undo_move(game, piece, old_pos, was_king, skip_data)
+                try:
+                    eval_score, _ = self.minimax(game, depth - 1, alpha, beta, False, child_pv)
+                finally:
+                    self.undo_move(game, piece, old_pos, was_king, skip_data)
 
                 if eval_score > max_eval:
                     max_eval = eval_score
                     best_move = (piece_pos, move)
+                    if pv is not None:
+                        pv[:] = [(piece_pos, move, skipped)] + child_pv
                 alpha = max(alpha, max_eval)
                 if beta <= alpha:
                     break
+            self.leave(key, quiet)
+            if moves is None:
+                self.store(key, depth, max_eval, alpha_orig, beta_orig, best_move)
             return max_eval, best_move
         else:
             min_eval = float('inf')
             for piece_pos, move, skipped in valid_moves:
+                child_pv = [] if pv is not None else None
+                self.quiet = 0 if skipped or not game.board.get_piece(*piece_pos).king else quiet + 1
                 piece, old_pos, was_king, skip_data = self.simulate_move(game, piece_pos, move, skipped)
-                eval_score, _ = self.minimax(game, depth - 1, alpha, beta, True)
-                self.undo_move(game, piece, old_pos, was_king, skip_data)
+                try:
+                    eval_score, _ = self.minimax(game, depth - 1, alpha, beta, True, child_pv)
+                finally:
+                    self.undo_move(game, piece, old_pos, was_king, skip_data)
 
                 if eval_score < min_eval:
                     min_eval = eval_score
                     best_move = (piece_pos, move)
+                    if pv is not None:
+                        pv[:] = [(piece_pos, move, skipped)] + child_pv
                 beta = min(beta, min_eval)
                 if beta <= alpha:
                     break
+            self.leave(key, quiet)
+            if moves is None:
+                self.store(key, depth, min_eval, alpha_orig, beta_orig, best_move)
             return min_eval, best_move
 
-    def make_move(self, game):
-        valid_moves = self.get_all_moves(game)
+    def negamax(self, game, depth, alpha, beta, color, pv=None, moves=None):
+        """Principal variation search: the first move gets the full window, the rest a
+        zero window that only proves them worse, re-searched if one turns out better.
+        Scores are from color's point of view; otherwise like minimax."""
+        self.nodes += 1
+        if self.nodes & 1023 == 0:
+            self.check_stop()
+
+        sign = 1 if color == self.color else -1
+        if depth == 0 or game.winner() is not None:
+            return sign * self.evaluate_board(game.board), None
+
+        key = position_key(game.board, color)
+        if self.is_repetition(key):
+            return 0, None
+        tt_move = None
+        entry = self.tt.get(key)
+        if entry is not None:
+            tt_depth, tt_score, bound, tt_move = entry
+            # Stored from our side; flip score and bound for the opponent's nodes
+            tt_score *= sign
+            if sign < 0 and bound != EXACT:
+                bound = LOWER if bound == UPPER else UPPER
+            if moves is None and tt_depth >= depth and (bound == EXACT or (bound == LOWER and tt_score >= beta)
+                                      or (bound == UPPER and tt_score <= alpha)):
+                if pv is not None and tt_move is not None:
+                    piece = game.board.get_piece(*tt_move[0])
+                    pv[:] = [(tt_move[0], tt_move[1], game.board.get_valid_moves(piece).get(tt_move[1]))]
+                return tt_score, tt_move
+
+        valid_moves = list(moves) if moves is not None else self.get_all_moves(game, color, cached=self.ply == 0)
         if not valid_moves:
-            return False
+            return sign * self.evaluate_board(game.board), None
+        if tt_move is not None:
+            valid_moves.sort(key=lambda m: (m[0], m[1]) != tt_move)
 
-        _, best_move = self.minimax(game, self.depth, float('-inf'), float('inf'), True)
+        opponent = PIECE_LIGHT if color == PIECE_DARK else PIECE_DARK
+        alpha_orig = alpha
+        best_score = float('-inf')
+        best_move = None
+        quiet = self.quiet
+        self.enter(key)
+        for i, (piece_pos, move, skipped) in enumerate(valid_moves):
+            child_pv = [] if pv is not None else None
+            king = game.board.get_piece(*piece_pos).king
+            self.quiet = 0 if skipped or not king else quiet + 1
+            reduction = 0
+            if i and not skipped and depth >= LMR_MIN_DEPTH:
+                reduction = self.reduction(i, depth)
+                # Promotions are never quiet
+                if reduction and move[0] in (0, ROWS - 1) and not king:
+                    reduction = 0
+            piece, old_pos, was_king, skip_data = self.simulate_move(game, piece_pos, move, skipped)
+            try:
+                if i == 0:
+                    score = -self.negamax(game, depth - 1, -beta, -alpha, opponent, child_pv)[0]
+                else:
+                    score = -self.negamax(game, depth - 1 - reduction, -alpha - 1, -alpha, opponent)[0]
+                    if reduction and score > alpha:
+                        # The reduced search says this move may be good after all: verify at full depth
+                        score = -self.negamax(game, depth - 1, -alpha - 1, -alpha, opponent)[0]
+                    if alpha < score < beta:
+                        score = -self.negamax(game, depth - 1, -beta, -alpha, opponent, child_pv)[0]
+            finally:
+                self.undo_move(game, piece, old_pos, was_king, skip_data)
+
+            if score > best_score:
+                best_score = score
+                best_move = (piece_pos, move)
+                if pv is not None:
+                    pv[:] = [(piece_pos, move, skipped)] + (child_pv or [])
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+        self.leave(key, quiet)
+        if moves is None:
+            if sign > 0:
+                self.store(key, depth, best_score, alpha_orig, beta, best_move)
+            else:
+                self.store(key, depth, -best_score, -beta, -alpha_orig, best_move)
+        return best_score, best_move
+
+    def reduction(self, index, depth):
+        """Plies to reduce the index-th move by under the LMR schedule, leaving at least one ply"""
+        plies = 0
+        for start, amount in self.lmr:
+            if index >= start:
+                plies = amount
+        return min(plies, depth - 2)
+
+    def search_root(self, game, depth, previous, pv, moves):
+        """One iteration of iterative_search with the configured algorithm; PVS starts
+        from a narrow window around the previous depth's score and widens on failure"""
+        if self.search == "alphabeta":
+            return self.minimax(game, depth, float('-inf'), float('inf'), True, pv, moves)
+        if previous is None:
+            return self.negamax(game, depth, float('-inf'), float('inf'), self.color, pv, moves)
+        delta = ASPIRATION_WINDOW
+        alpha, beta = previous - delta, previous + delta
+        while True:
+            pv[:] = []
+            score, best_move = self.negamax(game, depth, alpha, beta, self.color, pv, moves)
+            if alpha < score < beta or (alpha == float('-inf') and beta == float('inf')):
+                return score, best_move
+            # Failed low or high: widen that side, giving up on the window after a few tries
+            delta *= 4
+            if score <= alpha:
+                alpha = score - delta if delta < 100 * ASPIRATION_WINDOW else float('-inf')
+            else:
+                beta = score + delta if delta < 100 * ASPIRATION_WINDOW else float('inf')
+
+    def store(self, key, depth, score, alpha, beta, best_move):
+        if len(self.tt) >= TT_SIZE:
+            self.tt.clear()
+        if score <= alpha:
+            bound = UPPER
+        elif score >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        self.tt[key] = (depth, score, bound, best_move)
+
+    def time_budget(self, game):
+        """(soft, hard) seconds for this move from our clock, or None when the game has no clock"""
+        remaining = getattr(game, "black_time" if self.color == PIECE_DARK else "white_time", None)
+        if remaining is None:
+            return None
+        soft = remaining / MOVES_TO_GO
+        return soft, min(soft * HARD_LIMIT_FACTOR, remaining * MAX_CLOCK_SHARE)
+
+    def iterative_search(self, game, max_depth=None, stop_event=None, budget=None, moves=None):
+        """Deepen one ply at a time up to max_depth; returns (score, best_move, pv) of the
+        deepest completed iteration, or (None, None, []) if stopped during the first.
+        With a (soft, hard) budget no new depth starts after the soft limit and the
+        search is aborted at the hard one."""
+        self.nodes = 0
+        self.depth_reached = 0
+        self.start_search(game)
+        self.stop_event = stop_event
+        started = time.perf_counter()
+        if budget is not None:
+            soft, hard = budget
+            self.deadline = started + hard
+        result = (None, None, [])
+        try:
+            for depth in range(1, (max_depth or self.depth) + 1):
+                pv = []
+                score, best_move = self.search_root(game, depth, result[0], pv, moves)
+                changed = result[1] is not None and best_move != result[1]
+                result = (score, best_move, pv)
+                self.depth_reached = depth
+                if budget is not None:
+                    # An unstable best move earns more time, up to the hard limit
+                    if changed:
+                        soft = min(soft * 1.5, hard)
+                    # The next depth costs several times this one, so only start it early on
+                    if time.perf_counter() - started > soft / 2:
+                        break
+        except SearchAborted:
+            pass
+        finally:
+            self.stop_event = None
+            self.deadline = None
+        return result
+
+    def analyse(self, game, multipv=3, max_depth=None, stop_event=None):
+        """Iterative deepening over the root moves, yielding an info dict for each of
+        the best multipv lines after every depth: depth, multipv, score, pv, nodes, nps, time.
+        Runs until max_depth (default self.depth) or until stop_event is set."""
+        self.nodes = 0
+        self.start_search(game)
+        self.stop_event = stop_event
+        started = time.perf_counter()
+        root_moves = self.get_all_moves(game, cached=True)
+        # The root moves are searched here, so the root goes on the repetition stack by hand
+        root_quiet = self.quiet
+        self.enter(position_key(game.board, self.color))
+
+        try:
+            for depth in range(1, (max_depth or self.depth) + 1):
+                results = []
+                for piece_pos, move, skipped in root_moves:
+                    self.quiet = 0 if skipped or not game.board.get_piece(*piece_pos).king else root_quiet + 1
+                    # Once there are multipv lines, the others only need to prove they are worse
+                    scores = sorted((score for score, _ in results), reverse=True)
+                    alpha = scores[multipv - 1] if len(scores) >= multipv else float('-inf')
+                    pv = []
+                    piece, old_pos, was_king, skip_data = self.simulate_move(game, piece_pos, move, skipped)
+                    try:
+                        score, _ = self.minimax(game, depth - 1, alpha, float('inf'), False, pv)
+                    finally:
+                        self.undo_move(game, piece, old_pos, was_king, skip_data)
+                    results.append((score, [(piece_pos, move, skipped)] + pv))
+
+                # Best lines first, and searched first at the next depth
+                results.sort(key=lambda result: result[0], reverse=True)
+                root_moves = [line[0] for _, line in results]
+                elapsed = time.perf_counter() - started
+                for rank, (score, line) in enumerate(results[:multipv], 1):
+                    yield {
+                        "depth": depth,
+                        "multipv": rank,
+                        "score": score,
+                        "pv": line,
+                        "nodes": self.nodes,
+                        "nps": int(self.nodes / elapsed) if elapsed > 0 else 0,
+                        "time": elapsed,
+                    }
+        except SearchAborted:
+            return
+        finally:
+            self.stop_event = None
+
+    def capture_chain(self, game):
+        """The selected piece's captures while its capture chain continues, else None"""
+        selected = getattr(game, "selected", None)
+        if selected is None or selected.color != self.color:
+            return None
+        piece_pos = (selected.row, selected.col)
+        captures = [(piece_pos, move, skipped)
+                    for move, skipped in game.board.legal_moves(self.color).get(piece_pos, {}).items() if skipped]
+        return captures or None
+
+    def choose_move(self, game):
+        """Return the (piece_pos, move) to play, or None when there is no legal move"""
+        self.stop_pondering()
+        chain = self.capture_chain(game)
+        valid_moves = chain or self.get_all_moves(game, cached=True)
+        if not valid_moves:
+            return None
+        if len(valid_moves) == 1:
+            # A forced move or chain capture needs no search
+            piece_pos, move, _ = valid_moves[0]
+            self.last_pv = []
+            return piece_pos, move
+
+        # The opponent played the predicted move and the ponder search finished it
+        if (chain is None and self.ponder_result is not None
+                and self.ponder_result[0] == position_key(game.board, self.color)):
+            _, best_move, self.last_pv = self.ponder_result
+            self.ponder_result = None
+            if best_move is not None:
+                return best_move
+        self.ponder_result = None
+
+        _, best_move, self.last_pv = self.iterative_search(game, budget=self.time_budget(game), moves=chain)
         if best_move is None:
             piece_pos, move, _ = random.choice(valid_moves)
-        else:
-            piece_pos, move = best_move
+            return piece_pos, move
+        return best_move
+
+    def make_move(self, game):
+        best_move = self.choose_move(game)
+        if best_move is None:
+            return False
 
-        game.select(*piece_pos)
+        piece_pos, move = best_move
+
+        # Mid-chain the piece is already selected; selecting it again would drop the chain
+        if game.selected is None or (game.selected.row, game.selected.col) != piece_pos:
+            game.select(*piece_pos)
         game.select(*move)
+
+        # Keep jumping while the capture chain continues; single captures are instant
+        while game.turn == self.color and game.selected is not None and game.winner() is None:
+            best_move = self.choose_move(game)
+            if best_move is None or game.select(*best_move[1]) != "move_made":
+                break
+
+        # A finished game has no reply to ponder on
+        if self.ponder and game.turn != self.color and game.winner() is None:
+            self.start_pondering(game)
         return True
+
+    def start_pondering(self, game):
+        """Search the position after the opponent's expected reply in the background"""
+        if len(self.last_pv) < 2:
+            return
+        from .board import Board
+        from .headless import HeadlessGame
+
+        # Search a copy; the live board belongs to the UI while the opponent thinks
+        board = Board()
+        load_key(board, position_key(game.board, game.turn))
+        ponder_game = HeadlessGame(board)
+        ponder_game.turn = game.turn
+        if getattr(game, "history", None) is not None:
+            ponder_game.history = game.history.copy()
+        reply_pos, reply_move, _ = self.last_pv[1]
+        piece = board.get_piece(*reply_pos)
+        skipped = board.get_valid_moves(piece).get(reply_move) if piece != 0 else None
+        if skipped is None:
+            return
+        ponder_game.play(reply_pos, reply_move, skipped)
+        if ponder_game.winner() is not None:
+            return
+
+        self.ponder_stop = threading.Event()
+        self.ponder_thread = threading.Thread(target=self.ponder_search, args=(ponder_game, self.ponder_stop))
+        self.ponder_thread.daemon = True
+        self.ponder_thread.start()
+
+    def ponder_search(self, game, stop_event):
+        key = position_key(game.board, self.color)
+        score, best_move, pv = self.iterative_search(game, stop_event=stop_event)
+        if not stop_event.is_set():
+            self.ponder_result = (key, best_move, pv)
+
+    def stop_pondering(self):
+        if self.ponder_thread is not None:
+            self.ponder_stop.set()
+            self.ponder_thread.join()
+            self.ponder_thread = None
+            self.ponder_stop = None
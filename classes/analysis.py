@@ -0,0 +1,94 @@
+import threading
+import pygame
+from .constants import WIDTH
+from .ai import AIPlayer
+from .board import Board
+from .headless import HeadlessGame
+from .position import position_key, load_key
+from .record import square_number
+
+
+def format_move(piece_pos, move, skipped):
+    separator = "x" if skipped else "-"
+    return f"{square_number(*piece_pos)}{separator}{square_number(*move)}"
+
+
+class Analysis:
+    """Multi-PV engine analysis of the game position, searched in a background thread"""
+    def __init__(self, multipv=3, max_depth=10):
+        self.multipv = multipv
+        self.max_depth = max_depth
+        self.key = None
+        self.lines = []
+        self.lock = threading.Lock()
+        self.stop_event = None
+        self.thread = None
+        self.font = pygame.font.SysFont('Consolas', 18, bold=True)
+        self.title_font = pygame.font.SysFont('Consolas', 22, bold=True)
+
+    def update(self, game):
+        """Restart the search whenever the position on the board changes"""
+        key = position_key(game.board, game.turn)
+        if key == self.key:
+            return
+        self.stop()
+        self.key = key
+        with self.lock:
+            self.lines = []
+
+        # The search plays moves on its own copy of the position, never on the live board
+        board = Board()
+        turn = load_key(board, key)
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, args=(board, turn, game.history.copy(), self.stop_event))
+        self.thread.daemon = True
+        self.thread.start()
+
+    def run(self, board, turn, history, stop_event):
+        game = HeadlessGame(board)
+        game.turn = turn
+        game.history = history
+        ai = AIPlayer(turn)
+        lines = []
+        for info in ai.analyse(game, self.multipv, self.max_depth, stop_event):
+            if info["multipv"] == 1:
+                lines = []
+            lines.append(info)
+            with self.lock:
+                if stop_event.is_set():
+                    return
+                # Keep showing the previous depth until the new one is complete
+                if len(lines) >= len(self.lines):
+                    self.lines = list(lines)
+
+    def stop(self):
+        """Stop the background search and wait for its thread to finish"""
+        if self.stop_event is not None:
+            self.stop_event.set()
+            self.stop_event = None
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        self.key = None
+
+    def draw(self, win):
+        with self.lock:
+            lines = list(self.lines)
+
+        rect_x, rect_y, rect_width = WIDTH - 320, 140, 300
+        rect_height = 60 + 28 * self.multipv
+        pygame.draw.rect(win, (0, 0, 0), (rect_x - 2, rect_y - 2, rect_width + 4, rect_height + 4), border_radius=15)
+        pygame.draw.rect(win, (128, 128, 128), (rect_x, rect_y, rect_width, rect_height), border_radius=15)
+
+        if lines:
+            info = lines[0]
+            title = f"Depth {info['depth']}  {info['nps'] // 1000}k n/s"
+        else:
+            title = "Analysing..."
+        title_text = self.title_font.render(title, True, (255, 255, 255))
+        win.blit(title_text, title_text.get_rect(centerx=rect_x + rect_width // 2, top=rect_y + 12))
+
+        for i, info in enumerate(lines):
+            pv = " ".join(format_move(*step) for step in info["pv"][:4])
+            text = self.font.render(f"{info['score']:+5.0f}  {pv}", True, (255, 255, 255))
+            win.blit(text, (rect_x + 14, rect_y + 50 + 28 * i))
@@ -1,81 +1,54 @@
-import pygame
-import math
-from .constants import BOARD_DARK, BOARD_LIGHT, PIECE_DARK, PIECE_LIGHT, ROWS, COLS, SQUARE_SIZE, WIDTH, HEIGHT, GREY
+from .constants import PIECE_DARK, PIECE_LIGHT, ROWS, COLS
 from .piece import Piece
+from .position import position_key
+
+UP = ((-1, -1), (-1, 1))
+DOWN = ((1, -1), (1, 1))
+
+def _build_routes(directions, first_row=0):
+    """Per square, (vertical step, neighbour, landing) along each direction that stays
+    on the board; landing is the square beyond the neighbour, or None off the board"""
+    table = []
+    for row in range(ROWS):
+        table.append([])
+        for col in range(COLS):
+            routes = []
+            for dr, dc in directions:
+                neighbour = (row + dr, col + dc)
+                if not (0 <= neighbour[0] < ROWS and 0 <= neighbour[1] < COLS):
+                    continue
+                landing = (row + 2 * dr, col + 2 * dc)
+                if not (first_row <= landing[0] < ROWS and 0 <= landing[1] < COLS):
+                    landing = None
+                routes.append((dr, neighbour, landing))
+            table[row].append(tuple(routes))
+    return table
+
+# Moves from each square by (colour, king): men step towards the opponent, kings both ways
+MOVE_ROUTES = {
+    (PIECE_DARK, False): _build_routes(UP),
+    (PIECE_LIGHT, False): _build_routes(DOWN),
+    (PIECE_DARK, True): _build_routes(UP + DOWN),
+    (PIECE_LIGHT, True): _build_routes(UP + DOWN),
+}
+# Jumps continuing a capture chain keep its vertical direction. Upward chains never
+# land on row 0, as in the original diagonal traversal, so the move lists are unchanged
+CHAIN_ROUTES = {-1: _build_routes(UP, first_row=1), 1: _build_routes(DOWN)}
 
 class Board:
+    """The rules core shared by the game, the AI, tools and the network code.
+    Drawing lives in render.BoardRenderer, so creating a Board loads no assets."""
     def __init__(self):
         self.board = []
         self.red_left = self.white_left = 12
         self.red_kings = self.white_kings = 0
+        # Position key (side to move included) -> legal_moves() result, emptied on every change
+        self.legal_cache = {}
         self.create_board()
-        # Calculate offsets for centering
-        self.board_offset_x = (WIDTH - (COLS * SQUARE_SIZE)) // 2
-        self.board_offset_y = (HEIGHT - (ROWS * SQUARE_SIZE)) // 2
-        # Load wooden background
-        self.wood_bg = pygame.image.load("assets/wood.jpeg")
-        self.wood_bg = pygame.transform.scale(self.wood_bg, (COLS * SQUARE_SIZE, ROWS * SQUARE_SIZE))
-        # Initialize font for turn indicator
-        self.font = pygame.font.Font("assets/ps2p.ttf", 36)
     
-    def draw_turn_indicator(self, win, turn, black_time, white_time):
-        # Create text for turn
-        turn_text = "WHITE'S TURN" if turn == PIECE_LIGHT else "BLACK'S TURN"
-        text_surface = self.font.render(turn_text, True, (255, 0, 0))  # Red color
-        
-        # Calculate position (centered above the board)
-        text_rect = text_surface.get_rect(centerx=self.board_offset_x + (COLS * SQUARE_SIZE) // 2,
-                                        top=self.board_offset_y - 50)
-        
-        # Draw text with a subtle shadow for better visibility
-        shadow_surface = self.font.render(turn_text, True, (0, 0, 0))
-        shadow_rect = text_rect.copy()
-        shadow_rect.x += 2
-        shadow_rect.y += 2
-        win.blit(shadow_surface, shadow_rect)
-        win.blit(text_surface, text_rect)
-
-        # Draw timers
-        timer_font = pygame.font.Font("assets/ps2p.ttf", 28)
-        
-        # Black timer (extreme left)
-        black_time_text = f"BLACK: {self.format_time(black_time)}"
-        black_surface = timer_font.render(black_time_text, True, (0, 0, 0))
-        black_rect = black_surface.get_rect(
-            left=20,  # 20px from left edge
-            top=self.board_offset_y + (ROWS * SQUARE_SIZE) + 20  # 20px below the board
-        )
-        win.blit(black_surface, black_rect)
-        
-        # White timer (extreme right)
-        white_time_text = f"WHITE: {self.format_time(white_time)}"
-        white_surface = timer_font.render(white_time_text, True, (255, 255, 255))
-        white_rect = white_surface.get_rect(
-            right=WIDTH - 20,  # 20px from right edge
-            top=self.board_offset_y + (ROWS * SQUARE_SIZE) + 20  # 20px below the board
-        )
-        win.blit(white_surface, white_rect)
-
-    def format_time(self, seconds):
-        minutes = int(seconds // 60)
-        seconds = int(seconds % 60)
-        return f"{minutes:02d}:{seconds:02d}"
-
-    def draw_squares(self, win):
-        # Fill background with grey
-        win.fill(GREY)
-        # Draw wooden background
-        win.blit(self.wood_bg, (self.board_offset_x, self.board_offset_y))
-        # Draw the squares with transparency
-        for row in range(ROWS):
-            for col in range(COLS):
-                color = BOARD_DARK if (row + col) % 2 == 0 else BOARD_LIGHT
-                s = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE), pygame.SRCALPHA)
-                pygame.draw.rect(s, (*color, 180), (0, 0, SQUARE_SIZE, SQUARE_SIZE))
-                win.blit(s, (col * SQUARE_SIZE + self.board_offset_x, 
-                           row * SQUARE_SIZE + self.board_offset_y))
-
     def move(self, piece, row, col):
+        if self.legal_cache:
+            self.legal_cache.clear()
         self.board[piece.row][piece.col], self.board[row][col] = self.board[row][col], self.board[piece.row][piece.col]
         piece.move(row, col)
 
@@ -103,16 +76,9 @@ class Board:
                 else:
                     self.board[row].append(0)
         
-    def draw(self, win, turn, black_time, white_time):
-        self.draw_squares(win)
-        self.draw_turn_indicator(win, turn, black_time, white_time)
-        for row in range(ROWS):
-            for col in range(COLS):
-                piece = self.board[row][col]
-                if piece != 0:
-                    piece.draw(win)
-
     def remove(self, pieces):
+        if self.legal_cache:
+            self.legal_cache.clear()
         for piece in pieces:
             self.board[piece.row][piece.col] = 0
             if piece.color == PIECE_LIGHT:
@@ -127,86 +93,65 @@ class Board:
             return PIECE_LIGHT
         return None
     
-    def get_valid_moves(self, piece):
-        moves = {}
-        left = piece.col - 1
-        right = piece.col + 1
-        row = piece.row
-
-        if piece.color == PIECE_DARK or piece.king:
-            moves.update(self._traverse_left(row - 1, max(row - 3, -1), -1, piece.color, left))
-            moves.update(self._traverse_right(row - 1, max(row - 3, -1), -1, piece.color, right))
-        if piece.color == PIECE_LIGHT or piece.king:
-            moves.update(self._traverse_left(row + 1, min(row + 3, ROWS), 1, piece.color, left))
-            moves.update(self._traverse_right(row + 1, min(row + 3, ROWS), 1, piece.color, right))
-    
+    def legal_moves(self, color):
+        """{(row, col): {destination: captured pieces}} for every piece of color that can
+        move. Cached for the position until the board changes; don't modify the result."""
+        key = position_key(self, color)
+        moves = self.legal_cache.get(key)
+        if moves is None:
+            moves = {}
+            for piece in self.get_all_pieces(color):
+                piece_moves = self.get_valid_moves(piece)
+                if piece_moves:
+                    moves[(piece.row, piece.col)] = piece_moves
+            self.legal_cache[key] = moves
         return moves
 
-    def _traverse_left(self, start, stop, step, color, left, skipped=[]):
+    def get_valid_moves(self, piece):
+        """{destination: captured pieces} for a piece, capture-chain shortcuts included.
+        A chain destination lists only the last two pieces captured on the way."""
         moves = {}
-        last = []
-        for r in range(start, stop, step):
-            if left < 0:
-                break
-            
-            current = self.board[r][left]
+        grid = self.board
+        color = piece.color
+        for step, neighbour, landing in MOVE_ROUTES[color, piece.king][piece.row][piece.col]:
+            current = grid[neighbour[0]][neighbour[1]]
             if current == 0:
-                if skipped and not last:
-                    break
-                elif skipped:
-                    moves[(r, left)] = last + skipped
-                else:
-                    moves[(r, left)] = last
-                
-                if last:
-                    if step == -1:
-                        row = max(r - 3, 0)
-                    else:
-                        row = min(r + 3, ROWS)
-                    moves.update(self._traverse_left(r + step, row, step, color, left - 1, skipped=last))
-                    moves.update(self._traverse_right(r + step, row, step, color, left + 1, skipped=last))
-                break
-            elif current.color == color:
-                break
-            else:
-                last = [current]
-
-            left -= 1
-        
+                moves[neighbour] = []
+            elif current.color != color and landing is not None and grid[landing[0]][landing[1]] == 0:
+                for landings, captured in self._jump_paths(landing, step, current, color):
+                    moves[landings[-1]] = list(captured[:-3:-1])
         return moves
 
-    def _traverse_right(self, start, stop, step, color, right, skipped=[]):
-        moves = {}
-        last = []
-        for r in range(start, stop, step):
-            if right >= COLS:
-                break
-            
-            current = self.board[r][right]
-            if current == 0:
-                if skipped and not last:
-                    break
-                elif skipped:
-                    moves[(r, right)] = last + skipped
-                else:
-                    moves[(r, right)] = last
-                
-                if last:
-                    if step == -1:
-                        row = max(r - 3, 0)
-                    else:
-                        row = min(r + 3, ROWS)
-                    moves.update(self._traverse_left(r + step, row, step, color, right - 1, skipped=last))
-                    moves.update(self._traverse_right(r + step, row, step, color, right + 1, skipped=last))
-                break
-            elif current.color == color:
-                break
-            else:
-                last = [current]
-
-            right += 1
-        
-        return moves
+    def capture_paths(self, piece):
+        """Yield (origin, landings, captured) for every jump sequence of a piece, depth
+        first: the squares it lands on in order and every piece it jumps on the way"""
+        origin = (piece.row, piece.col)
+        grid = self.board
+        color = piece.color
+        for step, neighbour, landing in MOVE_ROUTES[color, piece.king][piece.row][piece.col]:
+            current = grid[neighbour[0]][neighbour[1]]
+            if current != 0 and current.color != color and landing is not None and grid[landing[0]][landing[1]] == 0:
+                for landings, captured in self._jump_paths(landing, step, current, color):
+                    yield origin, landings, captured
+
+    def _jump_paths(self, landing, step, current, color):
+        """The jump over current to landing and every chain continuing it in the same
+        vertical direction, as (landings, captured) tuples, with an explicit stack"""
+        grid = self.board
+        stack = [((landing,), (current,))]
+        while stack:
+            landings, captured = stack.pop()
+            yield landings, captured
+            row, col = landings[-1]
+            children = []
+            for _, neighbour, landing in CHAIN_ROUTES[step][row][col]:
+                if landing is None:
+                    continue
+                current = grid[neighbour[0]][neighbour[1]]
+                if current != 0 and current.color != color and grid[landing[0]][landing[1]] == 0:
+                    children.append((landings + (landing,), captured + (current,)))
+            # Popped left first, like the recursive traversal visited them
+            stack.extend(reversed(children))
 
     def get_all_pieces(self, color):
         pieces = []
@@ -216,36 +161,6 @@ class Board:
                     pieces.append(piece)
         return pieces
 
-    def draw_valid_moves(self, moves):
-        board_offset_x = (WIDTH - (COLS * SQUARE_SIZE)) // 2
-        board_offset_y = (HEIGHT - (ROWS * SQUARE_SIZE)) // 2
-        
-        # Enhanced animation parameters
-        t = pygame.time.get_ticks() / 1000.0  # Slower animation (800ms cycle)
-        base_radius = 15  # Smaller base radius
-        pulse = 6 * math.sin(t)  # Smaller pulse
-        glow_radius = int(base_radius + pulse)
-        
-        for move in moves:
-            row, col = move
-            center_x = col * SQUARE_SIZE + SQUARE_SIZE // 2 + board_offset_x
-            center_y = row * SQUARE_SIZE + SQUARE_SIZE // 2 + board_offset_y
-            
-            # # Draw outer glow
-            # glow_surface = pygame.Surface((glow_radius * 2, glow_radius * 2), pygame.SRCALPHA)
-            # for r in range(glow_radius, 0, -2):
-            #     alpha = int(100 * (1 - r/glow_radius))  # Fade out towards the edge
-            #     pygame.draw.circle(glow_surface, (0, 0, 255, alpha), (glow_radius, glow_radius), r)
-            # win.blit(glow_surface, (center_x - glow_radius, center_y - glow_radius))
-            
-            # # Draw inner circle
-            # inner_radius = int(base_radius * 0.6)  # Smaller inner circle
-            # pygame.draw.circle(win, (0, 0, 255), (center_x, center_y), inner_radius)
-            
-            # # Draw pulsing ring
-            # ring_radius = int(base_radius + pulse * 0.4)  # Smaller ring
-            # pygame.draw.circle(win, (0, 0, 255), (center_x, center_y), ring_radius, 2)
-
     def get_board_state(self):
         """
         Returns a serializable representation of the board state for network transmission
@@ -279,6 +194,7 @@ class Board:
         """
         if not state:
             return
+        self.legal_cache.clear()
             
         # Reset board
         for row in range(ROWS):
@@ -1,3 +1,4 @@
+import os
 import pygame
 
 WIDTH, HEIGHT = 1280,720
@@ -17,4 +18,11 @@ BOARD_LIGHT = (240, 217, 181)
 PIECE_DARK = BLACK
 PIECE_LIGHT = RED
 
+# Result of a drawn game, returned by winner() like a piece colour
+DRAW = "draw"
+# Draw rules: the same position with the same side to move this many times, or
+# this many plies in a row without a capture or a man moving
+REPETITION_LIMIT = 3
+NO_PROGRESS_PLIES = int(os.environ.get("CHECKERS_NO_PROGRESS", 80))
+
 CROWN = pygame.transform.scale(pygame.image.load('assets/crown.png'), (44, 25))
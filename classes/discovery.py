@@ -0,0 +1,122 @@
+"""
+LAN server discovery over UDP.
+
+A client broadcasts "CHECKERS_DISCOVER" to DISCOVERY_PORT; every server on the
+network answers "CHECKERS_SERVER <server id> <game port> <free seats>". Plain
+text is used on purpose: datagrams from anyone on the LAN are never unpickled.
+"""
+import os
+import secrets
+import socket
+import threading
+import time
+from .logger import get_logger
+
+log = get_logger("discovery")
+
+DISCOVERY_PORT = int(os.environ.get("CHECKERS_DISCOVERY_PORT", 5556))
+# Seconds the scanner listens for answers
+SCAN_WINDOW = 0.5
+# Seconds a scan result is reused before the network is scanned again
+CACHE_TTL = 30
+
+REQUEST = b"CHECKERS_DISCOVER"
+REPLY = "CHECKERS_SERVER"
+
+
+class DiscoveryResponder:
+    """Answers discovery broadcasts for a game server; seats() returns its free seats"""
+    def __init__(self, game_port, seats, port=DISCOVERY_PORT, host="0.0.0.0"):
+        self.game_port = game_port
+        self.seats = seats
+        self.server_id = secrets.token_hex(4)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((host, port))
+        self.thread = threading.Thread(target=self.run)
+        self.thread.daemon = True
+        self.thread.start()
+        log.info("Answering LAN discovery on UDP port %s", port)
+
+    def run(self):
+        while True:
+            try:
+                data, addr = self.sock.recvfrom(64)
+            except OSError:
+                return
+            if data.strip() != REQUEST:
+                continue
+            reply = f"{REPLY} {self.server_id} {self.game_port} {self.seats()}"
+            try:
+                self.sock.sendto(reply.encode(), addr)
+            except OSError as e:
+                log.debug("Discovery reply to %s failed: %s", addr, e)
+
+    def close(self):
+        self.sock.close()
+
+
+def scan(window=SCAN_WINDOW, port=DISCOVERY_PORT):
+    """Broadcast one discovery request and collect the answers for window seconds.
+    Returns a list of {"host", "port", "seats", "rtt"} dicts, fastest first."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+    servers = {}
+    try:
+        sent = time.perf_counter()
+        # Loopback as well, since broadcasts do not always reach a server on this machine
+        for target in ("<broadcast>", "127.0.0.1"):
+            try:
+                sock.sendto(REQUEST, (target, port))
+            except OSError as e:
+                log.debug("Discovery request to %s failed: %s", target, e)
+        deadline = sent + window
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            sock.settimeout(remaining)
+            try:
+                data, addr = sock.recvfrom(128)
+            except socket.timeout:
+                break
+            rtt = time.perf_counter() - sent
+            fields = data.decode(errors="replace").split()
+            if len(fields) != 4 or fields[0] != REPLY:
+                continue
+            try:
+                info = {"host": addr[0], "port": int(fields[2]), "seats": int(fields[3]), "rtt": rtt}
+            except ValueError:
+                continue
+            # One server answers once per route it was reached on; keep the quickest
+            if fields[1] not in servers or rtt < servers[fields[1]]["rtt"]:
+                servers[fields[1]] = info
+    finally:
+        sock.close()
+    return sorted(servers.values(), key=lambda info: info["rtt"])
+
+
+class ServerCache:
+    """Remembers the last scan so repeated lookups don't wait on the network"""
+    def __init__(self, ttl=CACHE_TTL, window=SCAN_WINDOW, port=DISCOVERY_PORT):
+        self.ttl = ttl
+        self.window = window
+        self.port = port
+        self.servers = []
+        self.scanned_at = None
+        self.lock = threading.Lock()
+
+    def get(self, refresh=False):
+        with self.lock:
+            if refresh or self.scanned_at is None or time.time() - self.scanned_at > self.ttl:
+                self.servers = scan(self.window, self.port)
+                self.scanned_at = time.time()
+                log.info("Found %d server(s) on the LAN", len(self.servers))
+            return list(self.servers)
+
+    def best(self, refresh=False):
+        """The lowest-latency server with a free seat (or any server if all are full), or None"""
+        servers = self.get(refresh)
+        if not servers:
+            return None
+        return min(servers, key=lambda info: (info["seats"] == 0, info["rtt"]))
@@ -0,0 +1,122 @@
+"""
+Vectorised position features for evaluation tuning (requires NumPy).
+
+Positions are encoded as rows of 32 int8 values, one per playable square
+in row-major order (square = row * 4 + col // 2):
+0 empty, 1 dark man, 2 dark king, -1 light man, -2 light king.
+
+Features are taken from one side's point of view, term for term as
+AIPlayer.evaluate_board scores them, so a row of features times the weights
+is that side's evaluation of the position.
+"""
+import numpy as np
+from .constants import ROWS, COLS, PIECE_DARK, PIECE_LIGHT
+from .board import Board
+from .position import SQUARES, SQUARE_INDEX
+
+# Feature columns, in the same order as ai.DEFAULT_WEIGHTS
+FEATURES = ("piece", "king", "center", "edge", "back_row", "capture")
+
+EMPTY, DARK_MAN, DARK_KING, LIGHT_MAN, LIGHT_KING = 0, 1, 2, -1, -2
+
+_rows = np.array([row for row, _ in SQUARES])
+_cols = np.array([col for _, col in SQUARES])
+CENTER_MASK = np.isin(_rows, (3, 4)) & np.isin(_cols, (3, 4))
+EDGE_MASK = np.isin(_cols, (0, 7))
+DARK_FAR_ROW = _rows == 0
+LIGHT_FAR_ROW = _rows == ROWS - 1
+
+
+def _jump_table():
+    """(origin, jumped, landing, moves_up) for every single jump that fits on the board"""
+    origins, jumped, landings, up = [], [], [], []
+    for i, (row, col) in enumerate(SQUARES):
+        for d_row in (-1, 1):
+            for d_col in (-1, 1):
+                land_row, land_col = row + 2 * d_row, col + 2 * d_col
+                if 0 <= land_row < ROWS and 0 <= land_col < COLS:
+                    origins.append(i)
+                    jumped.append(SQUARE_INDEX[(row + d_row, col + d_col)])
+                    landings.append(SQUARE_INDEX[(land_row, land_col)])
+                    up.append(d_row == -1)
+    return np.array(origins), np.array(jumped), np.array(landings), np.array(up)
+
+
+JUMP_FROM, JUMP_OVER, JUMP_TO, JUMP_UP = _jump_table()
+
+
+def encode_board(board):
+    """Encode a Board as a (32,) int8 array"""
+    encoded = np.zeros(len(SQUARES), dtype=np.int8)
+    for i, (row, col) in enumerate(SQUARES):
+        piece = board.get_piece(row, col)
+        if piece != 0:
+            value = DARK_KING if piece.king else DARK_MAN
+            encoded[i] = value if piece.color == PIECE_DARK else -value
+    return encoded
+
+
+def decode_board(encoded, board):
+    """Load an encoded position into an existing Board (the inverse of encode_board)"""
+    pieces = []
+    for i, value in enumerate(encoded):
+        if value != EMPTY:
+            row, col = SQUARES[i]
+            color = PIECE_DARK if value > 0 else PIECE_LIGHT
+            pieces.append({"row": row, "col": col, "color": color, "king": abs(value) == DARK_KING})
+    board.set_board_state({
+        "board_pieces": pieces,
+        "red_left": sum(1 for p in pieces if p["color"] == PIECE_LIGHT),
+        "white_left": sum(1 for p in pieces if p["color"] == PIECE_DARK),
+        "red_kings": sum(1 for p in pieces if p["color"] == PIECE_LIGHT and p["king"]),
+        "white_kings": sum(1 for p in pieces if p["color"] == PIECE_DARK and p["king"]),
+    })
+    return board
+
+
+def single_jumps(positions):
+    """Number of single jumps available to dark and to light in each position"""
+    origin = positions[:, JUMP_FROM]
+    over = positions[:, JUMP_OVER]
+    landing_free = positions[:, JUMP_TO] == EMPTY
+    # Dark men move up the board, light men down, kings both ways
+    dark = ((origin == DARK_KING) | ((origin == DARK_MAN) & JUMP_UP)) & (over < 0) & landing_free
+    light = ((origin == LIGHT_KING) | ((origin == LIGHT_MAN) & ~JUMP_UP)) & (over > 0) & landing_free
+    return dark.sum(axis=1), light.sum(axis=1)
+
+
+def capture_counts(positions):
+    """Pieces dark and light could capture in each position, counted like
+    AIPlayer.capture_bonus: the captured pieces of every capturing move, chains included"""
+    dark_jumps, light_jumps = single_jumps(positions)
+    counts = np.zeros((2, len(positions)), dtype=np.int32)
+    # Chains follow the scalar move generator, needed only where a side has a first jump
+    board = None
+    for i in np.flatnonzero((dark_jumps > 0) | (light_jumps > 0)):
+        board = decode_board(positions[i], board or Board())
+        for side, (color, jumps) in enumerate(((PIECE_DARK, dark_jumps), (PIECE_LIGHT, light_jumps))):
+            if jumps[i]:
+                counts[side, i] = sum(len(skipped) for piece in board.get_all_pieces(color)
+                                      for skipped in board.get_valid_moves(piece).values())
+    return counts[0], counts[1]
+
+
+def extract_features(positions, color=PIECE_DARK):
+    """(N, 32) encoded positions -> (N, len(FEATURES)) float32 from color's point of view:
+    its pieces minus the opponent's, and the pieces it could capture"""
+    positions = np.asarray(positions, dtype=np.int8).reshape(-1, len(SQUARES))
+    dark = positions > 0
+    light = positions < 0
+    dark_captures, light_captures = capture_counts(positions)
+
+    features = np.empty((len(positions), len(FEATURES)), dtype=np.float32)
+    features[:, 0] = dark.sum(axis=1) - light.sum(axis=1)
+    features[:, 1] = (positions == DARK_KING).sum(axis=1) - (positions == LIGHT_KING).sum(axis=1)
+    features[:, 2] = (dark & CENTER_MASK).sum(axis=1) - (light & CENTER_MASK).sum(axis=1)
+    features[:, 3] = (dark & EDGE_MASK).sum(axis=1) - (light & EDGE_MASK).sum(axis=1)
+    features[:, 4] = (dark & DARK_FAR_ROW).sum(axis=1) - (light & LIGHT_FAR_ROW).sum(axis=1)
+    if color == PIECE_LIGHT:
+        features[:, :5] = -features[:, :5]
+    # The capture bonus only counts the evaluating side's captures
+    features[:, 5] = dark_captures if color == PIECE_DARK else light_captures
+    return features
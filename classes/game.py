@@ -1,17 +1,24 @@
 import pygame
-from .constants import PIECE_DARK, PIECE_LIGHT, BLUE, SQUARE_SIZE, ROWS, COLS, WIDTH, HEIGHT, GREY, BOARD_DARK, BOARD_LIGHT
-import math
+from .constants import PIECE_DARK, PIECE_LIGHT, ROWS, WIDTH, DRAW
 import time
 
-# Import Piece class
-from .piece import Piece
+from .board import Board
+from .position import PositionHistory, position_key
+from .render import BoardRenderer
+from .record import RECORD_FILE, RecordWriter, result_for
+from .analysis import Analysis
 
 class Game:
-    def __init__(self, win, difficulty, show_help=False):
+    def __init__(self, win, difficulty, show_help=False, record=True):
         self.difficulty = difficulty
         self.show_valid_moves = show_help  # Use the help choice parameter instead of difficulty
+        # Moves are appended to the game record file as they are played
+        self.recorder = RecordWriter(RECORD_FILE if record else None)
+        # Engine analysis panel, toggled with toggle_analysis()
+        self.analysis = None
         self._init()
         self.win = win
+        self.renderer = BoardRenderer()
         self.board_offset_y = 200
         self.black_icon = pygame.image.load("assets/black_piece.png")
         self.red_icon = pygame.image.load("assets/white_piece.png")
@@ -32,9 +39,13 @@ class Game:
             self.move_sound = None
 
     def _init(self):
+        # A game reset before it was won is recorded as abandoned
+        self.recorder.finish("*")
         self.selected = None
-        self.board = Board(self)  # Pass the Game instance to Board
+        self.board = Board()
         self.turn = PIECE_DARK
+        # Positions since the last capture or man move, for repetition and no-progress draws
+        self.history = PositionHistory(position_key(self.board, self.turn))
         self.valid_moves = {}
         self.black_score = 0
         self.white_score = 0
@@ -44,8 +55,8 @@ class Game:
         self.last_time = time.time()
         self.is_paused = False
 
-    def update(self):
-        # Update timers
+    def update_timers(self):
+        """Charge the time since the last update to the side to move"""
         if not self.is_paused:
             current_time = time.time()
             elapsed = current_time - self.last_time
@@ -55,20 +66,34 @@ class Game:
                 self.white_time = max(0, self.white_time - elapsed)
             self.last_time = current_time
 
-        self.board.draw(self.win, self.turn, self.black_time, self.white_time)
+    def update(self):
+        self.update_timers()
+
+        self.renderer.draw(self.win, self.board, self.turn, self.black_time, self.white_time, self.selected)
         if self.show_valid_moves:
             self.draw_valid_moves(self.valid_moves)
         self.draw_scores()
+        if self.analysis:
+            self.analysis.update(self)
+            self.analysis.draw(self.win)
         self.draw_pause_button()
         pygame.display.update()
 
     def winner(self):
+        # The AI calls this on positions inside its search, so it must not touch the record
         # Check for timer-based wins
         if self.black_time <= 0:
             return PIECE_LIGHT  # White wins if black's time runs out
         if self.white_time <= 0:
             return PIECE_DARK  # Black wins if white's time runs out
-        return self.board.winner()
+        winner = self.board.winner()
+        if winner is None and self.history.is_draw():
+            winner = DRAW
+        return winner
+
+    def finish(self, winner):
+        """Close the game record with the result, once the game is really over"""
+        self.recorder.finish(result_for(winner))
 
     def reset(self):
         self._init()
@@ -96,8 +121,8 @@ class Game:
         if piece == 0 or piece.color != self.turn:
             return "nothing_selected"
             
-        # Valid selection
-        self.valid_moves = self.board.get_valid_moves(piece)
+        # Valid selection; the side's moves are generated once per position and reused
+        self.valid_moves = self.board.legal_moves(self.turn).get((row, col), {})
         
         # If there are no valid moves for this piece
         if not self.valid_moves:
@@ -109,6 +134,8 @@ class Game:
     def _move(self, row, col):
         piece = self.board.get_piece(row, col)
         if self.selected and piece == 0 and (row, col) in self.valid_moves:
+            start = (self.selected.row, self.selected.col)
+            was_king = self.selected.king
             self.board.move(self.selected, row, col)
             skipped = self.valid_moves[(row, col)]
             
@@ -118,11 +145,12 @@ class Game:
                     self.black_score += len(skipped)
                 else:
                     self.white_score += len(skipped)
-                new_moves = self.board.get_valid_moves(self.selected)
+                new_moves = self.board.legal_moves(self.turn).get((row, col), {})
                 capture_moves = {move: skips for move, skips in new_moves.items() if skips}
                 
                 if capture_moves:
                     self.valid_moves = capture_moves
+                    self.recorder.step(start, (row, col), True, turn_over=False)
                     return True
             
             if row == 0 or row == ROWS - 1:
@@ -132,7 +160,10 @@ class Game:
                 else:
                     self.board.white_kings += 1
             
+            self.recorder.step(start, (row, col), bool(skipped), turn_over=True)
             self.change_turn()
+            # A capture chain always captures, so only a lone king move makes no progress
+            self.history.push(position_key(self.board, self.turn), bool(skipped) or not was_king)
             # Play move sound if available and enabled
             if self.move_sound and getattr(self, 'enable_move_sound', False):
                 self.move_sound.play()
@@ -143,7 +174,7 @@ class Game:
         return False
 
     def draw_valid_moves(self, moves):
-        self.board.draw_valid_moves(self.win, moves)  # Pass win to Board.draw_valid_moves
+        self.renderer.draw_valid_moves(self.win, moves)
 
     def draw_scores(self):
         font = pygame.font.SysFont('Consolas', 40, bold=True)
@@ -179,7 +210,26 @@ class Game:
         pygame.draw.circle(self.win, (255, 255, 255), white_score_rect.center, 35)
         self.win.blit(white_score_text, white_score_rect)
 
+    def get_board_state(self):
+        """The board state for network transmission, with the scores"""
+        state = self.board.get_board_state()
+        state["black_score"] = self.black_score
+        state["white_score"] = self.white_score
+        return state
+
+    def set_board_state(self, state):
+        """Apply a board state received from the network, scores included"""
+        if not state:
+            return
+        self.board.set_board_state(state)
+        # Only our own moves pass through _move online, so draws can't be tracked across updates
+        self.history.reset(position_key(self.board, self.turn))
+        self.black_score = state.get("black_score", 0)
+        self.white_score = state.get("white_score", 0)
+
     def change_turn(self):
+        # The AI thinks between frames, so settle the clock before handing over the turn
+        self.update_timers()
         self.valid_moves = {}
         if self.turn == PIECE_DARK:
             self.turn = PIECE_LIGHT
@@ -187,15 +237,8 @@ class Game:
             self.turn = PIECE_DARK
 
     def get_valid_moves(self):
-        valid_moves = {}
-        for row in range(ROWS):
-            for col in range(COLS):
-                piece = self.board.get_piece(row, col)
-                if piece != 0 and piece.color == self.turn:
-                    moves = self.board.get_valid_moves(piece)
-                    if moves:
-                        valid_moves[(row, col)] = moves
-        return valid_moves
+        """{(row, col): {destination: captured}} for the side to move, from the board's cache"""
+        return self.board.legal_moves(self.turn)
 
     def draw_pause_button(self):
         # Draw button background with rounded corners
@@ -227,6 +270,20 @@ class Game:
         pygame.draw.rect(self.win, self.pause_icon_color, left_bar, border_radius=6)
         pygame.draw.rect(self.win, self.pause_icon_color, right_bar, border_radius=6)
 
+    def toggle_analysis(self):
+        if self.analysis:
+            self.analysis.stop()
+            self.analysis = None
+        else:
+            self.analysis = Analysis()
+
+    def close(self):
+        """Tear down a game that is being replaced: stop the analysis search and end the record"""
+        if self.analysis:
+            self.analysis.stop()
+            self.analysis = None
+        self.recorder.finish("*")
+
     def is_pause_button_clicked(self, pos):
         return self.pause_button.collidepoint(pos)
 
@@ -240,327 +297,3 @@ class Game:
         minutes = int(seconds // 60)
         seconds = int(seconds % 60)
         return f"{minutes:02d}:{seconds:02d}"
-
-class Board:
-    def __init__(self, game):
-        self.game = game  # Set the Game instance directly during initialization
-        self.board = []
-        self.red_left = self.white_left = 12
-        self.red_kings = self.white_kings = 0
-        self.create_board()
-        # Calculate offsets for centering
-        self.board_offset_x = (WIDTH - (COLS * SQUARE_SIZE)) // 2
-        self.board_offset_y = (HEIGHT - (ROWS * SQUARE_SIZE)) // 2
-        # Load wooden background
-        self.wood_bg = pygame.image.load("assets/wood.jpeg")
-        self.wood_bg = pygame.transform.scale(self.wood_bg, (COLS * SQUARE_SIZE, ROWS * SQUARE_SIZE))
-        # Initialize font for turn indicator
-        self.font = pygame.font.Font("assets/ps2p.ttf", 36)
-    
-    def draw_turn_indicator(self, win, turn, black_time, white_time):
-        # Create text for turn
-        turn_text = "WHITE'S TURN" if turn == PIECE_LIGHT else "BLACK'S TURN"
-        text_surface = self.font.render(turn_text, True, (255, 0, 0))  # Red color
-        
-        # Calculate position (centered above the board)
-        text_rect = text_surface.get_rect(centerx=self.board_offset_x + (COLS * SQUARE_SIZE) // 2,
-                                        top=self.board_offset_y - 50)
-        
-        # Draw text with a subtle shadow for better visibility
-        shadow_surface = self.font.render(turn_text, True, (0, 0, 0))
-        shadow_rect = text_rect.copy()
-        shadow_rect.x += 2
-        shadow_rect.y += 2
-        win.blit(shadow_surface, shadow_rect)
-        win.blit(text_surface, text_rect)
-
-        # Draw timers
-        timer_font = pygame.font.Font("assets/ps2p.ttf", 28)
-        
-        # Black timer (extreme left)
-        black_time_text = f"BLACK: {self.format_time(black_time)}"
-        black_surface = timer_font.render(black_time_text, True, (0, 0, 0))
-        black_rect = black_surface.get_rect(
-            left=20,  # 20px from left edge
-            top=self.board_offset_y + (ROWS * SQUARE_SIZE) + 20  # 20px below the board
-        )
-        win.blit(black_surface, black_rect)
-        
-        # White timer (extreme right)
-        white_time_text = f"WHITE: {self.format_time(white_time)}"
-        white_surface = timer_font.render(white_time_text, True, (255, 255, 255))
-        white_rect = white_surface.get_rect(
-            right=WIDTH - 20,  # 20px from right edge
-            top=self.board_offset_y + (ROWS * SQUARE_SIZE) + 20  # 20px below the board
-        )
-        win.blit(white_surface, white_rect)
-
-    def format_time(self, seconds):
-        minutes = int(seconds // 60)
-        seconds = int(seconds % 60)
-        return f"{minutes:02d}:{seconds:02d}"
-
-    def draw_squares(self, win):
-        # Fill background with grey
-        win.fill(GREY)
-        # Draw wooden background
-        win.blit(self.wood_bg, (self.board_offset_x, self.board_offset_y))
-        # Draw the squares with transparency
-        for row in range(ROWS):
-            for col in range(COLS):
-                color = BOARD_DARK if (row + col) % 2 == 0 else BOARD_LIGHT
-                s = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE), pygame.SRCALPHA)
-                pygame.draw.rect(s, (*color, 180), (0, 0, SQUARE_SIZE, SQUARE_SIZE))
-                win.blit(s, (col * SQUARE_SIZE + self.board_offset_x, 
-                           row * SQUARE_SIZE + self.board_offset_y))
-
-    def move(self, piece, row, col):
-        self.board[piece.row][piece.col], self.board[row][col] = self.board[row][col], self.board[piece.row][piece.col]
-        piece.move(row, col)
-
-        if row == ROWS - 1 or row == 0:
-            piece.make_king()
-            if piece.color == PIECE_LIGHT:
-                self.red_kings += 1
-            else:
-                self.white_kings += 1
-
-    def get_piece(self, row, col):
-        return self.board[row][col]
-
-    def create_board(self):
-        for row in range(ROWS):
-            self.board.append([])
-            for col in range(COLS):
-                if col % 2 == ((row + 1) % 2):
-                    if row < 3:
-                        self.board[row].append(Piece(row, col, PIECE_LIGHT))
-                    elif row > 4:
-                        self.board[row].append(Piece(row, col, PIECE_DARK))
-                    else:
-                        self.board[row].append(0)
-                else:
-                    self.board[row].append(0)
-        
-    def draw(self, win, turn, black_time, white_time):
-        self.draw_squares(win)
-        self.draw_turn_indicator(win, turn, black_time, white_time)
-        for row in range(ROWS):
-            for col in range(COLS):
-                piece = self.board[row][col]
-                if piece != 0:
-                    # Draw white border if the piece is selected
-                    if self.game.selected and piece == self.game.selected:
-                        # Draw a rounded rectangle border around the square with padding
-                        padding = 5  # Adjust padding size as needed
-                        rect_x = col * SQUARE_SIZE + self.board_offset_x + padding
-                        rect_y = row * SQUARE_SIZE + self.board_offset_y + padding
-                        rect_width = SQUARE_SIZE - 2 * padding
-                        rect_height = SQUARE_SIZE - 2 * padding
-                        border_thickness = 5  # Adjust thickness as needed
-                        border_radius = 15 # Adjust radius as needed for rounded corners
-
-                        # Draw shadow
-                        shadow_offset = 3 # Adjust shadow offset as needed
-                        shadow_color = (50, 50, 50) # Dark grey color for shadow
-                        pygame.draw.rect(win, shadow_color, (rect_x + shadow_offset, rect_y + shadow_offset, rect_width, rect_height), border_thickness, border_radius=border_radius)
-
-                        # Draw the white border
-                        pygame.draw.rect(win, (255, 255, 255), (rect_x, rect_y, rect_width, rect_height), border_thickness, border_radius=border_radius)
-
-                    piece.draw(win)
-
-    def remove(self, pieces):
-        for piece in pieces:
-            self.board[piece.row][piece.col] = 0
-            if piece.color == PIECE_LIGHT:
-                self.red_left -= 1
-            else:
-                self.white_left -= 1
-    
-    def winner(self):
-        if self.red_left <= 0:
-            return PIECE_DARK
-        elif self.white_left <= 0:
-            return PIECE_LIGHT
-        return None
-    
-    def get_valid_moves(self, piece):
-        moves = {}
-        left = piece.col - 1
-        right = piece.col + 1
-        row = piece.row
-
-        if piece.color == PIECE_DARK or piece.king:
-            moves.update(self._traverse_left(row - 1, max(row - 3, -1), -1, piece.color, left))
-            moves.update(self._traverse_right(row - 1, max(row - 3, -1), -1, piece.color, right))
-        if piece.color == PIECE_LIGHT or piece.king:
-            moves.update(self._traverse_left(row + 1, min(row + 3, ROWS), 1, piece.color, left))
-            moves.update(self._traverse_right(row + 1, min(row + 3, ROWS), 1, piece.color, right))
-    
-        return moves
-
-    def _traverse_left(self, start, stop, step, color, left, skipped=[]):
-        moves = {}
-        last = []
-        for r in range(start, stop, step):
-            if left < 0:
-                break
-            
-            current = self.board[r][left]
-            if current == 0:
-                if skipped and not last:
-                    break
-                elif skipped:
-                    moves[(r, left)] = last + skipped
-                else:
-                    moves[(r, left)] = last
-                
-                if last:
-                    if step == -1:
-                        row = max(r - 3, 0)
-                    else:
-                        row = min(r + 3, ROWS)
-                    moves.update(self._traverse_left(r + step, row, step, color, left - 1, skipped=last))
-                    moves.update(self._traverse_right(r + step, row, step, color, left + 1, skipped=last))
-                break
-            elif current.color == color:
-                break
-            else:
-                last = [current]
-
-            left -= 1
-        
-        return moves
-
-    def _traverse_right(self, start, stop, step, color, right, skipped=[]):
-        moves = {}
-        last = []
-        for r in range(start, stop, step):
-            if right >= COLS:
-                break
-            
-            current = self.board[r][right]
-            if current == 0:
-                if skipped and not last:
-                    break
-                elif skipped:
-                    moves[(r, right)] = last + skipped
-                else:
-                    moves[(r, right)] = last
-                
-                if last:
-                    if step == -1:
-                        row = max(r - 3, 0)
-                    else:
-                        row = min(r + 3, ROWS)
-                    moves.update(self._traverse_left(r + step, row, step, color, right - 1, skipped=last))
-                    moves.update(self._traverse_right(r + step, row, step, color, right + 1, skipped=last))
-                break
-            elif current.color == color:
-                break
-            else:
-                last = [current]
-
-            right += 1
-        
-        return moves
-
-    def get_all_pieces(self, color):
-        pieces = []
-        for row in self.board:
-            for piece in row:
-                if piece != 0 and piece.color == color:
-                    pieces.append(piece)
-        return pieces
-
-    def draw_valid_moves(self, win, moves):
-        board_offset_x = (WIDTH - (COLS * SQUARE_SIZE)) // 2
-        board_offset_y = (HEIGHT - (ROWS * SQUARE_SIZE)) // 2
-        
-        t = pygame.time.get_ticks() / 1000.0  # Time in seconds
-        animation_duration = 2.0 # Increased duration for a slower animation
-        animation_progress = (t % animation_duration) / animation_duration # Progress from 0 to 1
-        
-        min_radius = 5 # Smallest radius for the circle
-        max_radius = SQUARE_SIZE // 4 # Reduced max radius to make the circle smaller
-
-        # Calculate radius using a sine wave for grow and shrink effect
-        # sin(pi * progress) goes from 0 to 1 and back to 0 over progress 0 to 1
-        radius_factor = math.sin(animation_progress * math.pi)
-        current_radius = int(min_radius + radius_factor * (max_radius - min_radius))
-        
-        # Keep alpha relatively constant for a pulsing effect
-        alpha = 200 # Semi-transparent blue
-
-        for move in moves:
-            row, col = move
-            center_x = col * SQUARE_SIZE + SQUARE_SIZE // 2 + board_offset_x
-            center_y = row * SQUARE_SIZE + SQUARE_SIZE // 2 + board_offset_y
-            
-            # Draw the pulsing circle
-            if current_radius > 0 and alpha > 0:
-                circle_surface = pygame.Surface((current_radius * 2, current_radius * 2), pygame.SRCALPHA)
-                # Use a blue color with the calculated alpha
-                pygame.draw.circle(circle_surface, (0, 0, 255, alpha), (current_radius, current_radius), current_radius)
-                # Blit the circle surface onto the main window, centered
-                win.blit(circle_surface, (center_x - current_radius, center_y - current_radius))
-
-    def get_board_state(self):
-        """
-        Returns a serializable representation of the board state for network transmission
-        """
-        state = {
-            "board_pieces": [],
-            "red_left": self.red_left,
-            "white_left": self.white_left,
-            "red_kings": self.red_kings,
-            "white_kings": self.white_kings,
-            "black_score": self.game.black_score if self.game else 0,  # Fallback to 0 if game is None
-            "white_score": self.game.white_score if self.game else 0   # Fallback to 0 if game is None
-        }
-        
-        for row in range(ROWS):
-            for col in range(COLS):
-                piece = self.board[row][col]
-                if piece != 0:
-                    # Store piece data in a serializable format
-                    piece_data = {
-                        "row": piece.row,
-                        "col": piece.col,
-                        "color": piece.color,
-                        "king": piece.king
-                    }
-                    state["board_pieces"].append(piece_data)
-        
-        return state
-
-    def set_board_state(self, state):
-        """
-        Sets the board state based on a received network state
-        """
-        if not state:
-            return
-            
-        # Reset board
-        for row in range(ROWS):
-            for col in range(COLS):
-                self.board[row][col] = 0
-        
-        # Set piece counts
-        self.red_left = state["red_left"]
-        self.white_left = state["white_left"]
-        self.red_kings = state["red_kings"]
-        self.white_kings = state["white_kings"]
-        
-        # Set scores
-        if self.game:
-            self.game.black_score = state.get("black_score", 0)
-            self.game.white_score = state.get("white_score", 0)
-        
-        # Add pieces
-        for piece_data in state["board_pieces"]:
-            piece = Piece(piece_data["row"], piece_data["col"], piece_data["color"])
-            if piece_data["king"]:
-                piece.make_king()
-            self.board[piece_data["row"]][piece_data["col"]] = piece
\ No newline at end of file
@@ -0,0 +1,67 @@
+import os
+import random
+import pygame
+from .constants import PIECE_DARK, PIECE_LIGHT, DRAW
+from .board import Board
+from .position import PositionHistory, position_key
+
+
+def init_headless():
+    """Initialise pygame without a window or audio device (tools, workers, bots)"""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    pygame.init()
+
+
+class HeadlessGame:
+    """The rules side of Game without a window: enough for AIPlayer and self-play"""
+    def __init__(self, board=None):
+        self.board = board if board is not None else Board()
+        self.turn = PIECE_DARK
+        self.selected = None
+        self.black_score = 0
+        self.white_score = 0
+        self.plies = 0
+        self.history = PositionHistory(position_key(self.board, self.turn))
+
+    def winner(self):
+        winner = self.board.winner()
+        if winner is None and self.history.is_draw():
+            return DRAW
+        return winner
+
+    def get_all_moves(self, color=None):
+        """Every (piece_pos, move, skipped) for a colour, in board order"""
+        color = color or self.turn
+        return [(piece_pos, move, skipped)
+                for piece_pos, moves in self.board.legal_moves(color).items()
+                for move, skipped in moves.items()]
+
+    def play(self, piece_pos, move, skipped):
+        """Play a full turn like Game._move, following capture chains greedily"""
+        piece = self.board.get_piece(*piece_pos)
+        progress = bool(skipped) or not piece.king
+        while True:
+            self.board.move(piece, *move)
+            if not skipped:
+                break
+            self.board.remove(skipped)
+            if self.turn == PIECE_DARK:
+                self.black_score += len(skipped)
+            else:
+                self.white_score += len(skipped)
+            captures = [(m, s) for m, s in self.board.get_valid_moves(piece).items() if s]
+            if not captures:
+                break
+            move, skipped = max(captures, key=lambda capture: len(capture[1]))
+        self.turn = PIECE_LIGHT if self.turn == PIECE_DARK else PIECE_DARK
+        self.plies += 1
+        self.history.push(position_key(self.board, self.turn), progress)
+
+    def play_random(self, rng=random):
+        """Play a random legal move; returns False when the side to move is stuck"""
+        moves = self.get_all_moves()
+        if not moves:
+            return False
+        self.play(*rng.choice(moves))
+        return True
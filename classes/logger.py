@@ -0,0 +1,77 @@
+import atexit
+import collections
+import itertools
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+
+# Default level for every "checkers.*" logger, e.g. CHECKERS_LOG_LEVEL=WARNING in production
+DEFAULT_LEVEL = os.environ.get("CHECKERS_LOG_LEVEL", "INFO").upper()
+# Log one out of every SAMPLE_EVERY high-frequency events (per message, per broadcast...)
+SAMPLE_EVERY = int(os.environ.get("CHECKERS_LOG_SAMPLE", "100"))
+
+# Structured fields that can be attached to a record through `extra=`
+FIELDS = ("room", "player", "msg_type", "latency")
+
+_listener = None
+_sample_counters = collections.defaultdict(itertools.count)
+
+
+class StructuredFormatter(logging.Formatter):
+    """Appends the structured fields of a record as key=value pairs"""
+    def format(self, record):
+        line = super().format(record)
+        fields = []
+        for field in FIELDS:
+            value = getattr(record, field, None)
+            if value is None:
+                continue
+            if field == "latency":
+                value = f"{value * 1000:.2f}ms"
+            fields.append(f"{field}={value}")
+        if fields:
+            line = f"{line} {' '.join(fields)}"
+        return line
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that leaves all formatting to the listener thread"""
+    def prepare(self, record):
+        return record
+
+
+def _start_listener():
+    global _listener
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(StructuredFormatter("%(asctime)s %(levelname)s [%(name)s] %(message)s"))
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    root = logging.getLogger("checkers")
+    root.addHandler(DeferredQueueHandler(log_queue))
+    root.setLevel(DEFAULT_LEVEL)
+    root.propagate = False
+
+
+def get_logger(name):
+    """Return a "checkers.<name>" logger whose records are written by a background thread"""
+    if _listener is None:
+        _start_listener()
+    return logging.getLogger(f"checkers.{name}")
+
+
+def set_level(level):
+    """Change the level of every checkers logger at once"""
+    if _listener is None:
+        _start_listener()
+    logging.getLogger("checkers").setLevel(level.upper() if isinstance(level, str) else level)
+
+
+def sampled(key, every=None):
+    """True for one out of every `every` calls with the same key"""
+    every = every or SAMPLE_EVERY
+    return next(_sample_counters[key]) % every == 0
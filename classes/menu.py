@@ -1,6 +1,15 @@
 import pygame
 import random
+import threading
 from classes.constants import WIDTH, HEIGHT
+from classes.logger import get_logger
+from classes.discovery import ServerCache
+from classes.network import DEFAULT_PORT
+
+log = get_logger("client")
+
+# LAN scan results, shared by every OnlineMenu so reopening the menu doesn't rescan
+lan_servers = ServerCache()
 
 # Initialisation
 pygame.init()
@@ -295,17 +304,26 @@ class OnlineMenu:
         
         # Server IP input (default to localhost)
         self.server_ip = "localhost"
+        self.server_ip_edited = False
         self.server_ip_input_active = False
         self.server_ip_box = pygame.Rect(WIDTH//2 - 200, 400, 400, 50)
         
         # Buttons
         self.buttons = [
             Button(WIDTH//2 - 150, 500, 300, 70, "CONNECT", COLORS["secondary"], (46, 204, 113)),
-            Button(WIDTH//2 - 150, 600, 300, 70, "BACK", COLORS["accent"], (192, 57, 43))
+            Button(WIDTH//2 - 150, 600, 300, 70, "BACK", COLORS["accent"], (192, 57, 43)),
+            Button(WIDTH//2 + 220, 400, 140, 50, "SCAN", COLORS["primary"], (52, 152, 219))
         ]
         
+        # LAN discovery, run in the background; the best server fills the IP box
+        self.scanning = False
+        self.scan_result = None
+        self.lan_status = ""
+        self.start_scan()
+        
         # Network
         self.network = None
+        self.attempt = None  # ConnectAttempt in progress
         self.connected = False
         self.players = {}
         self.player_id = None
@@ -328,12 +346,12 @@ class OnlineMenu:
             
             if self.game_started:
                 # Game has been started by the host
-                print(f"[CLIENT] Received game start signal from players_update")
+                log.info("Received game start signal from players_update")
                 return "start_game"
         
         elif message["type"] == "game_started":
             # Direct game start notification
-            print(f"[CLIENT] Received direct game start notification")
+            log.info("Received direct game start notification")
             self.game_started = True
             return "start_game"
                 
@@ -401,7 +419,7 @@ class OnlineMenu:
         surface.blit(name_surf, (self.input_box.x + 10, self.input_box.y + 15))
         
         # Draw server IP prompt
-        server_prompt = text_font.render("Server IP (default: localhost):", True, COLORS["text"])
+        server_prompt = text_font.render(self.lan_status or "Server IP (default: localhost):", True, COLORS["text"])
         server_prompt_rect = server_prompt.get_rect(midtop=(WIDTH//2, 370))
         surface.blit(server_prompt, server_prompt_rect)
         
@@ -411,19 +429,79 @@ class OnlineMenu:
         server_surf = text_font.render(self.server_ip, True, COLORS["text"])
         surface.blit(server_surf, (self.server_ip_box.x + 10, self.server_ip_box.y + 15))
         
-        # Draw error message if any
-        if self.error_message and pygame.time.get_ticks() - self.error_timer < 5000:  # Show for 5 seconds
+        # Draw connection progress, or the error message if any
+        if self.attempt:
+            targets = ", ".join(host if port == DEFAULT_PORT else f"{host}:{port}" for host, port in self.attempt.candidates)
+            progress_surf = text_font.render(f"Connecting to {targets}... {self.attempt.elapsed():.1f}s", True, COLORS["text"])
+            progress_rect = progress_surf.get_rect(midtop=(WIDTH//2, 460))
+            surface.blit(progress_surf, progress_rect)
+        elif self.error_message and pygame.time.get_ticks() - self.error_timer < 5000:  # Show for 5 seconds
             error_surf = text_font.render(self.error_message, True, COLORS["accent"])
             error_rect = error_surf.get_rect(midtop=(WIDTH//2, 460))
             surface.blit(error_surf, error_rect)
         
         # Draw buttons
+        self.buttons[0].text = "CANCEL" if self.attempt else "CONNECT"
+        self.buttons[2].text = "..." if self.scanning else "SCAN"
         for button in self.buttons:
             button.draw(surface)
     
+    def start_scan(self, refresh=False):
+        if self.scanning:
+            return
+        self.scanning = True
+        thread = threading.Thread(target=self.run_scan, args=(refresh,))
+        thread.daemon = True
+        thread.start()
+    
+    def run_scan(self, refresh):
+        try:
+            self.scan_result = (lan_servers.get(refresh), lan_servers.best())
+        finally:
+            self.scanning = False
+    
+    def poll_scan(self):
+        """Show the result of a finished LAN scan and pick its lowest-latency server"""
+        if self.scan_result is None:
+            return
+        servers, best = self.scan_result
+        self.scan_result = None
+        if not best:
+            self.lan_status = "No LAN server found - enter IP:"
+            return
+        address = best["host"] if best["port"] == DEFAULT_PORT else f"{best['host']}:{best['port']}"
+        self.lan_status = f"LAN: {len(servers)} found, best {best['rtt'] * 1000:.1f} ms:"
+        # Don't overwrite an address the player typed themselves
+        if not self.server_ip_edited:
+            self.server_ip = address
+    
+    def poll_connection(self):
+        """Pick up the result of a finished connection attempt"""
+        if not self.attempt or self.attempt.state == "connecting":
+            return
+        attempt, self.attempt = self.attempt, None
+        if attempt.state == "connected":
+            self.network = attempt.network
+            self.network.set_callback(self.handle_network_message)
+            self.player_id = self.network.player_id
+            # Successfully connected, send name
+            if self.network.send_name(self.name_input):
+                self.connected = True
+            else:
+                self.error_message = "Failed to send name to server"
+                self.error_timer = pygame.time.get_ticks()
+        elif attempt.state == "failed":
+            self.error_message = attempt.error or "Could not connect to server"
+            self.error_timer = pygame.time.get_ticks()
+    
+    def cancel_connection(self):
+        if self.attempt:
+            self.attempt.cancel()
+            self.attempt = None
+    
     def run(self):
         """Run the online menu loop"""
-        from classes.network import Network
+        from classes.network import ConnectAttempt
         
         clock = pygame.time.Clock()
         
@@ -433,10 +511,15 @@ class OnlineMenu:
             
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
+                    self.cancel_connection()
                     if self.network and self.connected:
                         self.network.disconnect()
                     return "quit", None, None, True  # Always enable visual help in online mode
                 
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE and self.attempt:
+                    self.cancel_connection()
+                    continue
+                
                 if event.type == pygame.MOUSEBUTTONDOWN:
                     mouse_click = True
                     if not self.connected:
@@ -467,10 +550,15 @@ class OnlineMenu:
                             self.server_ip_input_active = False
                         elif event.key == pygame.K_BACKSPACE:
                             self.server_ip = self.server_ip[:-1]
+                            self.server_ip_edited = True
                         else:
-                            # Only allow valid IP characters
-                            if event.unicode.isdigit() or event.unicode == '.' or event.unicode.isalpha():
+                            # Only allow valid IP characters, ':' for a port and ',' between candidates
+                            if event.unicode.isdigit() or event.unicode in '.:,' or event.unicode.isalpha():
                                 self.server_ip += event.unicode
+                                self.server_ip_edited = True
+            
+            self.poll_connection()
+            self.poll_scan()
             
             # Handle different screens based on connection state
             if not self.connected:
@@ -489,30 +577,27 @@ class OnlineMenu:
                                     self.click_sound.play()
                                 continue
                             
-                            # Attempt to connect
-                            self.network = Network()
-                            
-                            if self.server_ip:
-                                self.network.set_server(self.server_ip)
-                            
-                            self.network.set_callback(self.handle_network_message)
-                            self.player_id = self.network.connect()
-                            
-                            if self.player_id is not None:
-                                # Successfully connected, send name
-                                if self.network.send_name(self.name_input):
-                                    self.connected = True
-                                else:
-                                    self.error_message = "Failed to send name to server"
-                                    self.error_timer = pygame.time.get_ticks()
-                            else:
-                                self.error_message = "Could not connect to server"
+                            # Attempt to connect in the background, to every listed server at once
+                            candidates = [c for c in self.server_ip.split(",") if c.strip()] or ["localhost"]
+                            try:
+                                self.attempt = ConnectAttempt(candidates)
+                            except ValueError:
+                                self.error_message = "Invalid server address"
                                 self.error_timer = pygame.time.get_ticks()
                                 
                             if self.click_sound:
                                 self.click_sound.play()
                                 
+                        elif button.text == "CANCEL":
+                            self.cancel_connection()
+                        
+                        elif button.text == "SCAN":
+                            # An explicit scan always goes to the network and picks the best server
+                            self.server_ip_edited = False
+                            self.start_scan(refresh=True)
+                            
                         elif button.text == "BACK":
+                            self.cancel_connection()
                             return "back", None, None, True  # Always enable visual help in online mode
             else:
                 # Draw waiting room
@@ -523,7 +608,7 @@ class OnlineMenu:
                     if action_button.text == "START GAME":
                         # Host starts the game
                         if self.network.start_game():
-                            print(f"[CLIENT] Player {self.player_id} starting game (responding to host command)")
+                            log.info("Starting game (responding to host command)", extra={"player": self.player_id})
                             return "online", self.name_input, self.network, True  # Always enable visual help in online mode
                     
                     elif action_button.text == "DISCONNECT":
@@ -533,7 +618,7 @@ class OnlineMenu:
                 
                 # Check if game was started by host
                 if self.network and self.game_started:
-                    print(f"[CLIENT] Player {self.player_id} starting game (responding to host command)")
+                    log.info("Starting game (responding to host command)", extra={"player": self.player_id})
                     return "online", self.name_input, self.network, True  # Always enable visual help in online mode
             
             pygame.display.flip()
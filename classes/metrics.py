@@ -0,0 +1,144 @@
+import bisect
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Histogram bucket upper bounds, in seconds (100us .. 1s)
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def merge(self, other):
+        for i, count in enumerate(other.counts):
+            self.counts[i] += count
+        self.count += other.count
+        self.sum += other.sum
+
+
+class Metrics:
+    """Thread-safe counters, gauges and histograms rendered in the Prometheus text format"""
+    def __init__(self, prefix="checkers"):
+        self.prefix = prefix
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self.started = time.time()
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def inc(self, name, value=1, **labels):
+        key = self._key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        with self.lock:
+            self.gauges[self._key(name, labels)] = value
+
+    def add(self, name, value, **labels):
+        key = self._key(name, labels)
+        with self.lock:
+            self.gauges[key] = self.gauges.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = self._key(name, labels)
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def forget(self, **labels):
+        """Drop every series carrying these labels (e.g. a closed room). Counters and histograms
+        are folded into the same series without those labels first, so their totals survive."""
+        wanted = set(labels.items())
+        with self.lock:
+            for series in (self.counters, self.gauges, self.histograms):
+                for key in [key for key in series if wanted <= set(key[1])]:
+                    value = series.pop(key)
+                    total = (key[0], tuple(label for label in key[1] if label not in wanted))
+                    if series is self.counters:
+                        series[total] = series.get(total, 0) + value
+                    elif series is self.histograms:
+                        if total not in series:
+                            series[total] = Histogram(value.buckets)
+                        series[total].merge(value)
+
+    def _series_name(self, name, labels, extra=()):
+        labels = labels + tuple(extra)
+        if not labels:
+            return f"{self.prefix}_{name}"
+        text = ",".join(f'{k}="{v}"' for k, v in labels)
+        return f"{self.prefix}_{name}{{{text}}}"
+
+    def render(self):
+        """Return every metric in the Prometheus text exposition format"""
+        lines = [f"{self.prefix}_uptime_seconds {time.time() - self.started:.3f}"]
+        with self.lock:
+            for (name, labels), value in sorted(self.counters.items()):
+                lines.append(f"{self._series_name(name, labels)} {value}")
+            for (name, labels), value in sorted(self.gauges.items()):
+                lines.append(f"{self._series_name(name, labels)} {value}")
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, count in zip(histogram.buckets + ("+Inf",), histogram.counts):
+                    cumulative += count
+                    lines.append(f"{self._series_name(name + '_bucket', labels, [('le', bound)])} {cumulative}")
+                lines.append(f"{self._series_name(name + '_count', labels)} {histogram.count}")
+                lines.append(f"{self._series_name(name + '_sum', labels)} {histogram.sum:.6f}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path):
+        with open(path, "w") as f:
+            f.write(self.render())
+
+    def serve(self, port, host="127.0.0.1"):
+        """Expose render() on http://host:port/metrics from a daemon thread"""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        httpd = ThreadingHTTPServer((host, port), Handler)
+        thread = threading.Thread(target=httpd.serve_forever)
+        thread.daemon = True
+        thread.start()
+        return httpd
+
+    def dump_periodically(self, path, interval=10):
+        """Rewrite the dump file every `interval` seconds from a daemon thread"""
+        def run():
+            while True:
+                time.sleep(interval)
+                self.dump(path)
+
+        thread = threading.Thread(target=run)
+        thread.daemon = True
+        thread.start()
+        return thread
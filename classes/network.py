@@ -1,43 +1,176 @@
+import io
+import os
+import collections
 import socket
 import pickle
 import threading
 import time
+import logging
+from .logger import get_logger, sampled
+
+log = get_logger("network")
+
+# How long to keep trying to resume a dropped session, and the first retry delay
+RECONNECT_WINDOW = 15
+RECONNECT_DELAY = 0.5
+
+# How long a connection attempt may take before it is abandoned
+CONNECT_TIMEOUT = float(os.environ.get("CHECKERS_CONNECT_TIMEOUT", 5))
+DEFAULT_PORT = 5555
+
+# Non-snapshot messages kept for the frame loop before the oldest are dropped
+INBOX_SIZE = 256
+
+
+def drain_messages(buffer):
+    """Split a receive buffer into complete pickled messages and the leftover bytes"""
+    messages = []
+    while buffer:
+        stream = io.BytesIO(buffer)
+        try:
+            message = pickle.load(stream)
+        except (EOFError, ValueError, pickle.UnpicklingError):
+            break
+        messages.append(message)
+        buffer = buffer[stream.tell():]
+    return messages, buffer
+
+
+class Inbox:
+    """Hand-off of received messages from the network thread to the main loop.
+    Game states are full snapshots, so only the newest one is kept."""
+    def __init__(self, maxsize=INBOX_SIZE):
+        # deque appends and pops are atomic; old events fall off the front when full
+        self.events = collections.deque(maxlen=maxsize)
+        self.state = None
+        self.superseded = 0
+        self.lock = threading.Lock()
+    
+    def put(self, message):
+        """Network thread side; never blocks the receive loop"""
+        if message["type"] == "game_state":
+            with self.lock:
+                if self.state is not None:
+                    self.superseded += 1
+                self.state = message
+        else:
+            self.events.append(message)
+    
+    def drain(self):
+        """Main loop side: the events received since the last call, then the newest game state"""
+        messages = []
+        while self.events:
+            messages.append(self.events.popleft())
+        with self.lock:
+            state, self.state = self.state, None
+        if state is not None:
+            messages.append(state)
+        return messages
+
+
+def parse_address(text):
+    """'host' or 'host:port' -> (host, port)"""
+    host, _, port = text.strip().partition(":")
+    return host or "localhost", int(port) if port else DEFAULT_PORT
+
+
+class ConnectAttempt:
+    """Connects to several candidate servers in parallel without blocking the caller.
+    The first server to accept wins; state is "connecting", "connected", "failed" or "cancelled"."""
+    def __init__(self, candidates, timeout=CONNECT_TIMEOUT):
+        self.candidates = [parse_address(c) if isinstance(c, str) else c for c in candidates]
+        self.timeout = timeout
+        self.state = "connecting"
+        self.network = None
+        self.error = None
+        self.started = time.time()
+        self.lock = threading.Lock()
+        self.pending = len(self.candidates)
+        self.attempts = []
+        for host, port in self.candidates:
+            network = Network()
+            network.set_server(host, port)
+            self.attempts.append(network)
+            thread = threading.Thread(target=self.run, args=(network,))
+            thread.daemon = True
+            thread.start()
+    
+    def run(self, network):
+        player_id = network.connect(self.timeout)
+        with self.lock:
+            self.pending -= 1
+            if player_id is not None and self.state == "connecting":
+                self.state = "connected"
+                self.network = network
+                return
+            if self.pending == 0 and self.state == "connecting":
+                self.state = "failed"
+                self.error = network.error
+        if player_id is not None:
+            # Another server answered first, or the attempt was cancelled
+            network.discard()
+    
+    def cancel(self):
+        with self.lock:
+            if self.state != "connecting":
+                return
+            self.state = "cancelled"
+        for network in self.attempts:
+            network.abort()
+    
+    def elapsed(self):
+        return time.time() - self.started
+
 
 class Network:
     def __init__(self):
         self.client = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.server = "localhost"  # Default to localhost
-        self.port = 5555
+        self.port = DEFAULT_PORT
         self.addr = (self.server, self.port)
         self.player_id = None
         self.connected = False
         self.callback = None
         self.receive_thread = None
+        # Session resumption state
+        self.token = None
+        self.last_seq = 0
+        self.unacked = None
+        self.buffer = b""
+        # Why the last connect() failed, for the menu
+        self.error = None
     
     def set_callback(self, callback):
         """Set a callback function that will be called when messages are received"""
         self.callback = callback
     
-    def set_server(self, server_ip):
-        """Set the server IP address"""
+    def set_server(self, server_ip, port=None):
+        """Set the server IP address (and port)"""
         self.server = server_ip
+        if port is not None:
+            self.port = port
         self.addr = (self.server, self.port)
-        print(f"[NETWORK] Server address set to: {server_ip}:{self.port}")
+        log.info("Server address set to: %s:%s", server_ip, self.port)
     
-    def connect(self):
-        """Connect to the server"""
+    def connect(self, timeout=CONNECT_TIMEOUT):
+        """Connect to the server, giving up after timeout seconds"""
         try:
-            print(f"[NETWORK] Connecting to server: {self.addr}")
+            log.info("Connecting to server: %s", self.addr)
+            self.client.settimeout(timeout)
             self.client.connect(self.addr)
             response = self.client.recv(1024).decode()
             
-            if response == "SERVER_FULL":
-                print("[NETWORK] Connection rejected: Server is full")
+            # "0" means the only free seats are held for dropped players
+            if response in ("SERVER_FULL", "0"):
+                log.warning("Connection rejected: Server is full")
+                self.error = "Server is full"
+                self.client.close()
                 return None
             
+            self.client.settimeout(None)
             self.player_id = int(response)
             self.connected = True
-            print(f"[NETWORK] Connected successfully as Player {self.player_id}")
+            log.info("Connected successfully", extra={"player": self.player_id})
             
             # Start receive thread
             self.receive_thread = threading.Thread(target=self.receive_messages)
@@ -45,28 +178,56 @@ class Network:
             self.receive_thread.start()
             
             return self.player_id
+        except socket.timeout:
+            log.error("Connection to %s timed out", self.addr)
+            self.error = "Connection timed out"
         except Exception as e:
-            print(f"[NETWORK] Connection error: {e}")
-            return None
+            log.error("Connection error: %s", e)
+            self.error = "Could not connect to server"
+        self.client.close()
+        return None
+    
+    def abort(self):
+        """Abandon a connection attempt running in another thread"""
+        try:
+            self.client.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.client.close()
+    
+    def discard(self):
+        """Hang up a connection that never got past the player id, sending nothing:
+        the server is still waiting for a name and would choke on a "leave" message"""
+        self.connected = False
+        try:
+            self.client.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.client.close()
     
     def disconnect(self):
         """Disconnect from the server"""
         try:
             if self.connected:
-                print("[NETWORK] Disconnecting from server")
+                log.info("Disconnecting from server")
                 self.connected = False
+                # Tell the server not to hold our seat for a resume
+                try:
+                    self.client.send(pickle.dumps({"type": "leave"}))
+                except OSError:
+                    pass
                 self.client.close()
         except Exception as e:
-            print(f"[NETWORK] Error during disconnect: {e}")
+            log.warning("Error during disconnect: %s", e)
     
     def send_name(self, name):
         """Send player name to server"""
         try:
-            print(f"[NETWORK] Sending player name: {name}")
+            log.info("Sending player name: %s", name)
             self.client.send(name.encode())
             return True
         except Exception as e:
-            print(f"[NETWORK] Error sending name: {e}")
+            log.error("Error sending name: %s", e)
             self.connected = False
             return False
     
@@ -74,11 +235,11 @@ class Network:
         """Send a message to start the game"""
         message = {"type": "start_game"}
         try:
-            print("[NETWORK] Sending start game request")
+            log.info("Sending start game request")
             self.client.send(pickle.dumps(message))
             return True
         except Exception as e:
-            print(f"[NETWORK] Error sending start game: {e}")
+            log.error("Error sending start game: %s", e)
             self.connected = False
             return False
     
@@ -89,35 +250,105 @@ class Network:
             "board": board,
             "turn": turn
         }
+        data = pickle.dumps(message)
+        # Kept until the server echoes it back, so it can be resent after a resume
+        self.unacked = data
         try:
-            print(f"[NETWORK] Sending move update. Turn: {turn}")
-            self.client.send(pickle.dumps(message))
+            log.debug("Sending move update. Turn: %s", turn, extra={"player": self.player_id, "msg_type": "move"})
+            self.client.send(data)
             return True
         except Exception as e:
-            print(f"[NETWORK] Error sending move: {e}")
+            if self.token and self.connected:
+                log.warning("Error sending move, will resend after reconnecting: %s", e)
+                return True
+            log.error("Error sending move: %s", e)
             self.connected = False
             return False
     
+    def dispatch(self, message):
+        """Track session state, then hand the message to the callback"""
+        if message["type"] == "session":
+            self.token = message["token"]
+            return
+        
+        if message["type"] == "game_state":
+            self.last_seq = message.get("seq", self.last_seq)
+            self.unacked = None
+        
+        if log.isEnabledFor(logging.DEBUG) and sampled("network.receive", 10):
+            log.debug("Received message", extra={"player": self.player_id, "msg_type": message["type"]})
+        
+        # Call the callback function with the message
+        if self.callback:
+            result = self.callback(message)
+            if result == "start_game":
+                log.info("Detected game start from callback")
+    
+    def resume(self):
+        """Reconnect after a drop and replay the moves missed in between"""
+        deadline = time.time() + RECONNECT_WINDOW
+        delay = RECONNECT_DELAY
+        while self.connected and time.time() < deadline:
+            client = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            try:
+                client.settimeout(5)
+                client.connect(self.addr)
+                if client.recv(1024).decode() == "SERVER_FULL":
+                    raise ConnectionError("server full")
+                client.send(f"RESUME {self.token} {self.last_seq}".encode())
+                
+                messages, buffer = [], b""
+                while not messages:
+                    data = client.recv(4096)
+                    if not data:
+                        raise ConnectionError("connection closed during resume")
+                    messages, buffer = drain_messages(buffer + data)
+                reply = messages[0]
+                if reply["type"] != "resumed":
+                    log.error("Server refused to resume the session")
+                    client.close()
+                    return False
+                
+                client.settimeout(None)
+                old_client, self.client, self.buffer = self.client, client, buffer
+                old_client.close()
+                self.player_id = reply["player_id"]
+                log.info("Session resumed, replaying %d missed move(s)", len(reply["moves"]),
+                         extra={"player": self.player_id})
+                for message in reply["moves"] + messages[1:]:
+                    self.dispatch(message)
+                
+                if self.unacked is not None:
+                    # Our last move never reached the server
+                    self.client.send(self.unacked)
+                return True
+            except Exception as e:
+                client.close()
+                log.warning("Reconnect attempt failed: %s", e)
+                time.sleep(delay)
+                delay = min(delay * 2, 4)
+        return False
+    
     def receive_messages(self):
         """Continuously receive messages from the server"""
         while self.connected:
             try:
                 data = self.client.recv(4096)
                 if not data:
-                    print("[NETWORK] Disconnected from server (no data)")
-                    self.connected = False
-                    break
-                
-                message = pickle.loads(data)
-                print(f"[NETWORK] Received message of type: {message['type']}")
+                    raise ConnectionError("disconnected from server (no data)")
                 
-                # Call the callback function with the message
-                if self.callback:
-                    result = self.callback(message)
-                    if result == "start_game":
-                        print("[NETWORK] Detected game start from callback")
-                    
+                messages, self.buffer = drain_messages(self.buffer + data)
+                for message in messages:
+                    self.dispatch(message)
+            
             except Exception as e:
-                print(f"[NETWORK] Error receiving data: {e}")
+                if not self.connected:
+                    # disconnect() closed the socket on purpose
+                    break
+                if self.token:
+                    log.warning("Connection lost, trying to resume: %s", e)
+                    if self.resume():
+                        continue
+                log.error("Error receiving data: %s", e)
                 self.connected = False
-                break
\ No newline at end of file
+                break
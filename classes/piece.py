@@ -7,29 +7,43 @@ CROWN = pygame.transform.scale(pygame.image.load("assets/crown.png"), (32, 18))
 
 
 
+# Pixel position of the board's top-left corner, for centring it in the window
+BOARD_OFFSET_X = (WIDTH - (8 * SQUARE_SIZE)) // 2
+BOARD_OFFSET_Y = (HEIGHT - (8 * SQUARE_SIZE)) // 2
+
+
 class Piece:
+    """A man or king. Slots keep it small, since the search moves pieces thousands of
+    times a second; screen coordinates are only worked out when drawing."""
+    __slots__ = ("row", "col", "color", "king")
     PADDING = 15
     OUTLINE = 4
 
     def __init__(self, row, col, color):
         self.row = row
         self.col = col
-        self.color = color
+        # Share the colour constants, so pieces rebuilt from network states don't carry copies
+        self.color = PIECE_DARK if color == PIECE_DARK else PIECE_LIGHT
         self.king = False
-        self.x = 0
-        self.y = 0
-        # Calculate offsets for centering
-        self.board_offset_x = (WIDTH - (8 * SQUARE_SIZE)) // 2
-        self.board_offset_y = (HEIGHT - (8 * SQUARE_SIZE)) // 2
-        self.calc_pos()
 
-    def calc_pos(self):
-        self.x = SQUARE_SIZE * self.col + SQUARE_SIZE // 2 + self.board_offset_x
-        self.y = SQUARE_SIZE * self.row + SQUARE_SIZE // 2 + self.board_offset_y
+    @property
+    def x(self):
+        return SQUARE_SIZE * self.col + SQUARE_SIZE // 2 + BOARD_OFFSET_X
+
+    @property
+    def y(self):
+        return SQUARE_SIZE * self.row + SQUARE_SIZE // 2 + BOARD_OFFSET_Y
 
     def make_king(self):
         self.king = True
 
+    def __deepcopy__(self, memo):
+        # Copied boards share the colour constants; there is nothing else to copy deeply
+        piece = Piece.__new__(Piece)
+        piece.row, piece.col, piece.color, piece.king = self.row, self.col, self.color, self.king
+        memo[id(self)] = piece
+        return piece
+
     # def draw(self, win):
     #     radius = SQUARE_SIZE // 2 - self.PADDING
     #     outline_color = WHITE
@@ -45,17 +59,17 @@ class Piece:
         else:  # red player (using white piece image)
             image = WHITE_PIECE_IMG
 
-        rect = image.get_rect(center=(self.x, self.y))
+        x, y = self.x, self.y
+        rect = image.get_rect(center=(x, y))
         win.blit(image, rect)
 
         if self.king:
-            win.blit(CROWN, (self.x - CROWN.get_width() // 2, self.y - CROWN.get_height() // 2))
+            win.blit(CROWN, (x - CROWN.get_width() // 2, y - CROWN.get_height() // 2))
 
 
     def move(self, row, col):
         self.row = row
         self.col = col
-        self.calc_pos()
 
     def __repr__(self):
         return str(self.color)
\ No newline at end of file
@@ -0,0 +1,190 @@
+"""
+Compact position keys and FEN-like text for both Board classes.
+
+A key is 12 bytes: three little-endian 32-bit masks (dark pieces, light
+pieces, kings) over the playable squares, bit i = row * 4 + col // 2.
+The side to move rides in the kings mask: when light is to move, every
+empty square's bit is set too, so a position holds at most MAX_PIECES pieces.
+Keys are immutable bytes, so they hash and compare cheaply and can be used
+directly as dict keys, in files or in network messages.
+
+FEN uses the standard draughts form with PDN square numbers:
+
+    B:W21,22,23,24,25,26,27,28,29,30,31,32:B1,2,3,4,5,6,7,8,9,10,11,12
+
+Black is PIECE_DARK, White is PIECE_LIGHT and kings are prefixed with K.
+"""
+import struct
+from .constants import ROWS, COLS, PIECE_DARK, PIECE_LIGHT, REPETITION_LIMIT, NO_PROGRESS_PLIES
+from .piece import Piece
+
+KEY_SIZE = 12
+FULL_MASK = 0xFFFFFFFF
+# Leaves the 8 empty squares that carry the side to move
+MAX_PIECES = 24
+
+# (row, col) of each of the 32 playable squares, in bit order
+SQUARES = [(row, col) for row in range(ROWS) for col in range(COLS) if (row + col) % 2 == 1]
+SQUARE_INDEX = {square: i for i, square in enumerate(SQUARES)}
+
+_KEY = struct.Struct("<III")
+
+
+def masks(board):
+    """(dark, light, kings) bit masks of a Board"""
+    dark = light = kings = 0
+    grid = board.board
+    for i, (row, col) in enumerate(SQUARES):
+        piece = grid[row][col]
+        if piece != 0:
+            bit = 1 << i
+            if piece.color == PIECE_DARK:
+                dark |= bit
+            else:
+                light |= bit
+            if piece.king:
+                kings |= bit
+    return dark, light, kings
+
+
+def pack_key(dark, light, kings, turn=PIECE_DARK):
+    if turn == PIECE_LIGHT:
+        kings |= FULL_MASK & ~(dark | light)
+    return _KEY.pack(dark, light, kings)
+
+
+def unpack_key(key):
+    """12-byte key -> (dark, light, kings, turn)"""
+    dark, light, kings = _KEY.unpack(key)
+    occupied = dark | light
+    turn = PIECE_LIGHT if kings & ~occupied else PIECE_DARK
+    return dark, light, kings & occupied, turn
+
+
+def position_key(board, turn=PIECE_DARK):
+    """The 12-byte key of a Board with the given side to move"""
+    return pack_key(*masks(board), turn)
+
+
+def set_masks(board, dark, light, kings):
+    """Replace the pieces of a Board with the given masks"""
+    board.legal_cache.clear()
+    grid = board.board
+    for row in range(ROWS):
+        for col in range(COLS):
+            grid[row][col] = 0
+    for i, (row, col) in enumerate(SQUARES):
+        bit = 1 << i
+        if (dark | light) & bit:
+            piece = Piece(row, col, PIECE_DARK if dark & bit else PIECE_LIGHT)
+            if kings & bit:
+                piece.make_king()
+            grid[row][col] = piece
+    board.white_left = bin(dark).count("1")
+    board.red_left = bin(light).count("1")
+    board.white_kings = bin(dark & kings).count("1")
+    board.red_kings = bin(light & kings).count("1")
+
+
+def load_key(board, key):
+    """Set a Board to the position of a key; returns the side to move"""
+    dark, light, kings, turn = unpack_key(key)
+    set_masks(board, dark, light, kings)
+    return turn
+
+
+def _pdn_square(i):
+    # Same numbering as classes.record: Black's back row is 1-4
+    return 32 - i
+
+
+def key_to_fen(key):
+    dark, light, kings, turn = unpack_key(key)
+
+    def pieces(mask):
+        squares = sorted((_pdn_square(i), kings >> i & 1) for i in range(32) if mask >> i & 1)
+        return ",".join(f"{'K' if king else ''}{number}" for number, king in squares)
+
+    side = "B" if turn == PIECE_DARK else "W"
+    return f"{side}:W{pieces(light)}:B{pieces(dark)}"
+
+
+def fen_to_key(fen):
+    """Parse FEN like 'W:W18,K22:B1-4,K9'; ranges and either colour order are accepted"""
+    fields = fen.strip().rstrip(".").split(":")
+    if not fields or fields[0].upper() not in ("B", "W"):
+        raise ValueError(f"Invalid FEN side to move: {fen!r}")
+    turn = PIECE_DARK if fields[0].upper() == "B" else PIECE_LIGHT
+    dark = light = kings = 0
+    for field in fields[1:]:
+        color, squares = field[:1].upper(), field[1:]
+        if color not in ("B", "W"):
+            raise ValueError(f"Invalid FEN colour in {field!r}")
+        for token in filter(None, squares.split(",")):
+            king = token[0].upper() == "K"
+            token = token.lstrip("Kk")
+            first, _, last = token.partition("-")
+            for number in range(int(first), int(last or first) + 1):
+                if not 1 <= number <= 32:
+                    raise ValueError(f"Invalid FEN square {number}")
+                bit = 1 << (32 - number)
+                if (dark | light) & bit:
+                    raise ValueError(f"FEN places two pieces on square {number}: {fen!r}")
+                if color == "B":
+                    dark |= bit
+                else:
+                    light |= bit
+                if king:
+                    kings |= bit
+    count = bin(dark | light).count("1")
+    if count > MAX_PIECES:
+        raise ValueError(f"FEN has {count} pieces, at most {MAX_PIECES} fit in a key: {fen!r}")
+    return pack_key(dark, light, kings, turn)
+
+
+def to_fen(board, turn=PIECE_DARK):
+    return key_to_fen(position_key(board, turn))
+
+
+def from_fen(board, fen):
+    """Set a Board from FEN; returns the side to move"""
+    return load_key(board, fen_to_key(fen))
+
+
+class PositionHistory:
+    """Keys of the positions since the last capture or man move, for the draw rules.
+    Positions before such a move can never recur, so the stack's length also counts
+    the plies without progress."""
+    def __init__(self, key=None, no_progress_plies=NO_PROGRESS_PLIES):
+        self.no_progress_plies = no_progress_plies
+        self.keys = []
+        self.counts = {}
+        if key is not None:
+            self.reset(key)
+
+    def reset(self, key):
+        self.keys = [key]
+        self.counts = {key: 1}
+
+    def push(self, key, progress):
+        """Record the position after a turn; progress is True after a capture or a man move"""
+        if progress:
+            self.reset(key)
+            return
+        self.keys.append(key)
+        self.counts[key] = self.counts.get(key, 0) + 1
+
+    def quiet_plies(self):
+        return max(0, len(self.keys) - 1)
+
+    def is_draw(self):
+        if not self.keys:
+            return False
+        return (self.counts[self.keys[-1]] >= REPETITION_LIMIT
+                or self.quiet_plies() >= self.no_progress_plies)
+
+    def copy(self):
+        history = PositionHistory(no_progress_plies=self.no_progress_plies)
+        history.keys = list(self.keys)
+        history.counts = dict(self.counts)
+        return history
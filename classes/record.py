@@ -0,0 +1,144 @@
+"""
+Game records in a one-line PDN format.
+
+Each game is a single line: its tags, the numbered moves and the result,
+
+    [Event "Checkers"] [Date "2025.01.31"] 1. 11-15 23-19 2. 8-11 22-17 ... 1-0
+
+Squares use the standard 1-32 numbering with Black (PIECE_DARK) on 1-12,
+captures are written with "x" and multi-jumps list every landing square
+(9x18x27). Results are from Black's side: 1-0, 0-1, 1/2-1/2, or * when the
+game was abandoned.
+"""
+import os
+import re
+import time
+from .constants import PIECE_DARK, PIECE_LIGHT
+from .logger import get_logger
+
+log = get_logger("record")
+
+# Where Game appends its records; an empty CHECKERS_RECORD turns recording off
+RECORD_FILE = os.environ.get("CHECKERS_RECORD", "games.pdn")
+
+RESULTS = ("1-0", "0-1", "1/2-1/2", "*")
+TAG_PATTERN = re.compile(r'\[(\w+) "([^"]*)"\]')
+MOVE_NUMBER = re.compile(r"\d+\.")
+
+
+def square_number(row, col):
+    """(row, col) of a playable square -> PDN square 1-32"""
+    return 32 - (row * 4 + col // 2)
+
+
+def square_position(number):
+    """PDN square 1-32 -> (row, col)"""
+    index = 32 - number
+    row = index // 4
+    return row, 2 * (index % 4) + (1 - row % 2)
+
+
+def result_for(winner):
+    if winner == PIECE_DARK:
+        return "1-0"
+    if winner == PIECE_LIGHT:
+        return "0-1"
+    return "1/2-1/2"
+
+
+class RecordWriter:
+    """Appends games to a PDN file move by move, so a crash loses nothing already played"""
+    def __init__(self, path=RECORD_FILE, **tags):
+        self.path = path
+        self.tags = tags
+        self.file = None
+        self.plies = 0
+        self.in_move = False
+
+    def start(self):
+        self.file = open(self.path, "a+b")
+        # Terminate a line left open by a game that never finished
+        if self.file.tell() > 0:
+            self.file.seek(-1, os.SEEK_END)
+            if self.file.read(1) != b"\n":
+                self.file.write(b" *\n")
+        tags = dict(Event="Checkers", Date=time.strftime("%Y.%m.%d"), **self.tags)
+        self.write(" ".join(f'[{key} "{value}"]' for key, value in tags.items()))
+        self.plies = 0
+        self.in_move = False
+
+    def step(self, start, end, capture, turn_over):
+        """Record one hop of the side to move; turn_over is False while a capture chain continues"""
+        if not self.path:
+            return
+        try:
+            if self.file is None:
+                self.start()
+            if self.in_move:
+                self.write(f"x{square_number(*end)}")
+            else:
+                number = f"{self.plies // 2 + 1}. " if self.plies % 2 == 0 else ""
+                separator = "x" if capture else "-"
+                self.write(f" {number}{square_number(*start)}{separator}{square_number(*end)}")
+            self.in_move = not turn_over
+            if turn_over:
+                self.plies += 1
+        except OSError as e:
+            log.warning("Game recording disabled, cannot write %s: %s", self.path, e)
+            self.close()
+            self.path = None
+
+    def finish(self, result="*"):
+        """End the current game's line; does nothing if no move was recorded"""
+        if self.file is None:
+            return
+        try:
+            self.write(f" {result}\n")
+        except OSError as e:
+            log.warning("Could not finish game record: %s", e)
+        self.close()
+
+    def write(self, text):
+        self.file.write(text.encode())
+        self.file.flush()
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+def parse_game(line):
+    """One PDN line -> {"tags": {...}, "moves": [[square, ...], ...], "result": str}"""
+    tags = dict(TAG_PATTERN.findall(line))
+    moves = []
+    result = "*"
+    for token in TAG_PATTERN.sub(" ", line).split():
+        if token in RESULTS:
+            result = token
+        elif not MOVE_NUMBER.fullmatch(token):
+            moves.append([int(square) for square in re.split("[-x]", token)])
+    return {"tags": tags, "moves": moves, "result": result}
+
+
+def read_games(path):
+    """Yield the games of a PDN file one at a time, without loading the whole file"""
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                yield parse_game(line)
+
+
+def replay(moves, board):
+    """Play recorded moves on a board (starting position), yielding it after each move"""
+    for squares in moves:
+        piece = board.get_piece(*square_position(squares[0]))
+        for square in squares[1:]:
+            target = square_position(square)
+            skipped = board.get_valid_moves(piece).get(target) if piece != 0 else None
+            if skipped is None:
+                raise ValueError(f"Illegal move in record: {'-'.join(map(str, squares))}")
+            board.move(piece, *target)
+            if skipped:
+                board.remove(skipped)
+        yield board
@@ -0,0 +1,134 @@
+import math
+import pygame
+from .constants import PIECE_LIGHT, SQUARE_SIZE, ROWS, COLS, WIDTH, HEIGHT, GREY, BOARD_DARK, BOARD_LIGHT
+
+
+class BoardRenderer:
+    """Draws a rules Board with its turn indicator and clocks; assets are loaded once"""
+    def __init__(self):
+        # Calculate offsets for centering
+        self.board_offset_x = (WIDTH - (COLS * SQUARE_SIZE)) // 2
+        self.board_offset_y = (HEIGHT - (ROWS * SQUARE_SIZE)) // 2
+        # Load wooden background
+        self.wood_bg = pygame.image.load("assets/wood.jpeg")
+        self.wood_bg = pygame.transform.scale(self.wood_bg, (COLS * SQUARE_SIZE, ROWS * SQUARE_SIZE))
+        # Fonts for the turn indicator and timers
+        self.font = pygame.font.Font("assets/ps2p.ttf", 36)
+        self.timer_font = pygame.font.Font("assets/ps2p.ttf", 28)
+        # Translucent overlay for each square colour
+        self.square_surfaces = {}
+        for color in (BOARD_DARK, BOARD_LIGHT):
+            s = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE), pygame.SRCALPHA)
+            pygame.draw.rect(s, (*color, 180), (0, 0, SQUARE_SIZE, SQUARE_SIZE))
+            self.square_surfaces[color] = s
+
+    def draw(self, win, board, turn, black_time, white_time, selected=None):
+        self.draw_squares(win)
+        self.draw_turn_indicator(win, turn, black_time, white_time)
+        for row in range(ROWS):
+            for col in range(COLS):
+                piece = board.get_piece(row, col)
+                if piece != 0:
+                    # Draw white border if the piece is selected
+                    if selected and piece == selected:
+                        self.draw_selection(win, row, col)
+                    piece.draw(win)
+
+    def draw_selection(self, win, row, col):
+        # Draw a rounded rectangle border around the square with padding
+        padding = 5  # Adjust padding size as needed
+        rect_x = col * SQUARE_SIZE + self.board_offset_x + padding
+        rect_y = row * SQUARE_SIZE + self.board_offset_y + padding
+        rect_width = SQUARE_SIZE - 2 * padding
+        rect_height = SQUARE_SIZE - 2 * padding
+        border_thickness = 5  # Adjust thickness as needed
+        border_radius = 15 # Adjust radius as needed for rounded corners
+
+        # Draw shadow
+        shadow_offset = 3 # Adjust shadow offset as needed
+        shadow_color = (50, 50, 50) # Dark grey color for shadow
+        pygame.draw.rect(win, shadow_color, (rect_x + shadow_offset, rect_y + shadow_offset, rect_width, rect_height), border_thickness, border_radius=border_radius)
+
+        # Draw the white border
+        pygame.draw.rect(win, (255, 255, 255), (rect_x, rect_y, rect_width, rect_height), border_thickness, border_radius=border_radius)
+
+    def draw_turn_indicator(self, win, turn, black_time, white_time):
+        # Create text for turn
+        turn_text = "WHITE'S TURN" if turn == PIECE_LIGHT else "BLACK'S TURN"
+        text_surface = self.font.render(turn_text, True, (255, 0, 0))  # Red color
+
+        # Calculate position (centered above the board)
+        text_rect = text_surface.get_rect(centerx=self.board_offset_x + (COLS * SQUARE_SIZE) // 2,
+                                        top=self.board_offset_y - 50)
+
+        # Draw text with a subtle shadow for better visibility
+        shadow_surface = self.font.render(turn_text, True, (0, 0, 0))
+        shadow_rect = text_rect.copy()
+        shadow_rect.x += 2
+        shadow_rect.y += 2
+        win.blit(shadow_surface, shadow_rect)
+        win.blit(text_surface, text_rect)
+
+        # Black timer (extreme left)
+        black_time_text = f"BLACK: {self.format_time(black_time)}"
+        black_surface = self.timer_font.render(black_time_text, True, (0, 0, 0))
+        black_rect = black_surface.get_rect(
+            left=20,  # 20px from left edge
+            top=self.board_offset_y + (ROWS * SQUARE_SIZE) + 20  # 20px below the board
+        )
+        win.blit(black_surface, black_rect)
+
+        # White timer (extreme right)
+        white_time_text = f"WHITE: {self.format_time(white_time)}"
+        white_surface = self.timer_font.render(white_time_text, True, (255, 255, 255))
+        white_rect = white_surface.get_rect(
+            right=WIDTH - 20,  # 20px from right edge
+            top=self.board_offset_y + (ROWS * SQUARE_SIZE) + 20  # 20px below the board
+        )
+        win.blit(white_surface, white_rect)
+
+    def format_time(self, seconds):
+        minutes = int(seconds // 60)
+        seconds = int(seconds % 60)
+        return f"{minutes:02d}:{seconds:02d}"
+
+    def draw_squares(self, win):
+        # Fill background with grey
+        win.fill(GREY)
+        # Draw wooden background
+        win.blit(self.wood_bg, (self.board_offset_x, self.board_offset_y))
+        # Draw the squares with transparency
+        for row in range(ROWS):
+            for col in range(COLS):
+                color = BOARD_DARK if (row + col) % 2 == 0 else BOARD_LIGHT
+                win.blit(self.square_surfaces[color], (col * SQUARE_SIZE + self.board_offset_x,
+                                                       row * SQUARE_SIZE + self.board_offset_y))
+
+    def draw_valid_moves(self, win, moves):
+        t = pygame.time.get_ticks() / 1000.0  # Time in seconds
+        animation_duration = 2.0 # Increased duration for a slower animation
+        animation_progress = (t % animation_duration) / animation_duration # Progress from 0 to 1
+
+        min_radius = 5 # Smallest radius for the circle
+        max_radius = SQUARE_SIZE // 4 # Reduced max radius to make the circle smaller
+
+        # Calculate radius using a sine wave for grow and shrink effect
+        # sin(pi * progress) goes from 0 to 1 and back to 0 over progress 0 to 1
+        radius_factor = math.sin(animation_progress * math.pi)
+        current_radius = int(min_radius + radius_factor * (max_radius - min_radius))
+
+        # Keep alpha relatively constant for a pulsing effect
+        alpha = 200 # Semi-transparent blue
+
+        for move in moves:
+            row, col = move
+            center_x = col * SQUARE_SIZE + SQUARE_SIZE // 2 + self.board_offset_x
+            center_y = row * SQUARE_SIZE + SQUARE_SIZE // 2 + self.board_offset_y
+
+            # Draw the pulsing circle
+            if current_radius > 0 and alpha > 0:
+                circle_surface = pygame.Surface((current_radius * 2, current_radius * 2), pygame.SRCALPHA)
+                # Use a blue color with the calculated alpha
+                pygame.draw.circle(circle_surface, (0, 0, 255, alpha), (current_radius, current_radius), current_radius)
+                # Blit the circle surface onto the main window, centered
+                win.blit(circle_surface, (center_x - current_radius, center_y - current_radius))
@@ -0,0 +1,454 @@
+"""
+Load-testing harness for server.py.
+
+Spawns pairs of headless bot clients on localhost that speak the same
+protocol as classes/network.Network, play random or AI moves against each
+other and report connection rate, message throughput, per-move round-trip
+latency and server memory growth.
+
+    python loadtest.py --spawn-server --pairs 500 --rate 200
+    python loadtest.py --port 5555 --server-pid 1234 --pairs 50 --engine ai
+"""
+import argparse
+import pickle
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+from classes.constants import PIECE_DARK, PIECE_LIGHT
+from classes.board import Board
+from classes.ai import AIPlayer
+from classes.headless import HeadlessGame, init_headless
+from classes.network import drain_messages
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+LATENCY_BUCKETS = [0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, float('inf')]
+
+
+class LoadStats:
+    """Counters shared by every bot, guarded by a single lock"""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.connects_ok = 0
+        self.connects_failed = 0
+        self.rejected_full = 0
+        self.first_connect = None
+        self.last_connect = None
+        self.messages_in = 0
+        self.messages_out = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.moves = 0
+        self.games_finished = 0
+        self.dropped = 0
+        self.rtts = []
+
+    def connected(self):
+        now = time.perf_counter()
+        with self.lock:
+            self.connects_ok += 1
+            if self.first_connect is None:
+                self.first_connect = now
+            self.last_connect = now
+
+    def failed(self, full=False):
+        with self.lock:
+            self.connects_failed += 1
+            if full:
+                self.rejected_full += 1
+
+    def received(self, count, size):
+        with self.lock:
+            self.messages_in += count
+            self.bytes_in += size
+
+    def sent(self, size):
+        with self.lock:
+            self.messages_out += 1
+            self.bytes_out += size
+
+    def move_acked(self, rtt):
+        with self.lock:
+            self.moves += 1
+            self.rtts.append(rtt)
+
+    def game_finished(self):
+        with self.lock:
+            self.games_finished += 1
+
+    def dropped_by_server(self):
+        with self.lock:
+            self.dropped += 1
+
+
+class MemorySampler:
+    """Samples the resident set size of a process from /proc (Linux only)"""
+    def __init__(self, pid, interval=0.5):
+        self.pid = pid
+        self.interval = interval
+        self.samples = []
+        self.running = False
+
+    def read_rss(self):
+        try:
+            with open(f"/proc/{self.pid}/status") as status:
+                for line in status:
+                    if line.startswith("VmRSS:"):
+                        return int(line.split()[1]) * 1024
+        except OSError:
+            return None
+        return None
+
+    def start(self):
+        self.running = True
+        thread = threading.Thread(target=self._run)
+        thread.daemon = True
+        thread.start()
+
+    def stop(self):
+        self.running = False
+        rss = self.read_rss()
+        if rss is not None:
+            self.samples.append(rss)
+
+    def _run(self):
+        while self.running:
+            rss = self.read_rss()
+            if rss is None:
+                break
+            self.samples.append(rss)
+            time.sleep(self.interval)
+
+
+# The host's opening position, the same for every game
+OPENING_STATE = Board().get_board_state()
+
+
+class BotClient:
+    """Headless client speaking the same protocol as classes/network.Network"""
+    def __init__(self, name, addr, stats, engine="random", difficulty="easy", max_moves=200, read_delay=0):
+        self.name = name
+        self.addr = addr
+        self.stats = stats
+        self.engine = engine
+        self.difficulty = difficulty
+        self.max_moves = max_moves
+        # Seconds slept after every read, to simulate a slow consumer
+        self.read_delay = read_delay
+        self.client = None
+        self.player_id = None
+        self.color = None
+        self.players = {}
+        self.started = False
+        self.sent_at = None
+        self.moves_played = 0
+        # Boards load no assets, so every bot generates its moves on its own one
+        self.board = Board()
+        self.done = threading.Event()
+
+    def send(self, message):
+        data = pickle.dumps(message)
+        self.client.sendall(data)
+        self.stats.sent(len(data))
+
+    def run(self):
+        try:
+            self.client = socket.create_connection(self.addr, timeout=10)
+            if self.read_delay:
+                self.client.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+            response = self.client.recv(1024).decode()
+            if response in ("SERVER_FULL", "0"):
+                self.stats.failed(full=True)
+                self.close()
+                return
+            self.player_id = int(response)
+            # Player 1 plays the light pieces, as in main.py
+            self.color = PIECE_LIGHT if self.player_id == 1 else PIECE_DARK
+            self.client.sendall(self.name.encode())
+            self.client.settimeout(None)
+            self.stats.connected()
+        except Exception:
+            self.stats.failed()
+            self.close()
+            return
+
+        buffer = b""
+        try:
+            while not self.done.is_set():
+                data = self.client.recv(4096)
+                if not data:
+                    self.stats.dropped_by_server()
+                    break
+                if self.read_delay:
+                    time.sleep(self.read_delay)
+                messages, buffer = drain_messages(buffer + data)
+                self.stats.received(len(messages), len(data))
+                for message in messages:
+                    self.handle_message(message)
+                    if self.done.is_set():
+                        break
+        except Exception:
+            pass
+        finally:
+            self.close()
+
+    def handle_message(self, message):
+        if message["type"] == "players_update":
+            if self.started and len(message["players"]) < 2:
+                # Opponent left after the game ended
+                self.done.set()
+                return
+            self.players = message["players"]
+            if self.player_id == 1 and len(self.players) == 2 and not message["game_started"]:
+                self.send({"type": "start_game"})
+
+        elif message["type"] == "game_started":
+            self.started = True
+            if self.player_id == 1:
+                # The host sends the opening position, as main.py does
+                self.sent_at = time.perf_counter()
+                self.send({"type": "move", "board": OPENING_STATE, "turn": PIECE_DARK})
+
+        elif message["type"] == "game_state":
+            if self.sent_at is not None:
+                self.stats.move_acked(time.perf_counter() - self.sent_at)
+                self.sent_at = None
+            if message["turn"] == self.color and message["board"] is not None:
+                self.play_turn(message["board"])
+
+    def play_turn(self, state):
+        if self.moves_played >= self.max_moves:
+            self.finish()
+            return
+
+        board = self.board
+        board.set_board_state(state)
+        if board.winner() is not None or not self.apply_move(board):
+            new_state = None
+        else:
+            new_state = board.get_board_state()
+
+        if new_state is None:
+            self.finish()
+            return
+
+        self.moves_played += 1
+        next_turn = PIECE_DARK if self.color == PIECE_LIGHT else PIECE_LIGHT
+        self.sent_at = time.perf_counter()
+        self.send({"type": "move", "board": new_state, "turn": next_turn})
+
+    def apply_move(self, board):
+        """Play one full turn (including capture chains) on the bot's board"""
+        options = []
+        for piece in board.get_all_pieces(self.color):
+            for move, skipped in board.get_valid_moves(piece).items():
+                options.append((piece, move, skipped))
+        if not options:
+            return False
+
+        choice = None
+        if self.engine == "ai":
+            best_move = AIPlayer(self.color, self.difficulty).choose_move(HeadlessGame(board))
+            if best_move is not None:
+                piece_pos, move = best_move
+                for option in options:
+                    if (option[0].row, option[0].col) == piece_pos and option[1] == move:
+                        choice = option
+                        break
+        if choice is None:
+            choice = random.choice(options)
+
+        piece, move, skipped = choice
+        while True:
+            board.move(piece, *move)
+            if not skipped:
+                break
+            board.remove(skipped)
+            captures = [(m, s) for m, s in board.get_valid_moves(piece).items() if s]
+            if not captures:
+                break
+            move, skipped = random.choice(captures)
+        return True
+
+    def finish(self):
+        self.stats.game_finished()
+        self.send({"type": "leave"})
+        self.done.set()
+
+    def close(self):
+        self.done.set()
+        if self.client:
+            try:
+                self.client.close()
+            except OSError:
+                pass
+
+
+def free_port():
+    """A local TCP port nothing listens on right now"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_server(process, metrics_port, timeout=10):
+    """Poll a spawned server's metrics endpoint, which comes up once the game port listens.
+    A connection to the game port would be given a seat and skew the first room."""
+    deadline = time.time() + timeout
+    while time.time() < deadline and process.poll() is None:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{metrics_port}/metrics", timeout=1):
+                return True
+        except OSError:
+            time.sleep(0.1)
+    return False
+
+
+def fetch_metrics(port, host="127.0.0.1"):
+    """The server's metrics text, or None if the endpoint can't be read"""
+    try:
+        with urllib.request.urlopen(f"http://{host}:{port}/metrics", timeout=5) as response:
+            return response.read().decode()
+    except OSError as e:
+        print(f"[LOADTEST] Could not read server metrics: {e}")
+        return None
+
+
+def format_bytes(size):
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(size) < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+def print_report(stats, elapsed, sampler, metrics=None):
+    print("\n===== LOAD TEST REPORT =====")
+    print(f"Duration:            {elapsed:.2f}s")
+    print(f"Connections:         {stats.connects_ok} ok, {stats.connects_failed} failed "
+          f"({stats.rejected_full} rejected as full)")
+    if stats.first_connect is not None and stats.last_connect > stats.first_connect:
+        rate = stats.connects_ok / (stats.last_connect - stats.first_connect)
+        print(f"Connection rate:     {rate:.1f} conn/s")
+    print(f"Messages in:         {stats.messages_in} ({stats.messages_in / elapsed:.1f} msg/s, "
+          f"{format_bytes(stats.bytes_in)})")
+    print(f"Messages out:        {stats.messages_out} ({stats.messages_out / elapsed:.1f} msg/s, "
+          f"{format_bytes(stats.bytes_out)})")
+    print(f"Moves acknowledged:  {stats.moves} ({stats.moves / elapsed:.1f} moves/s)")
+    print(f"Games finished:      {stats.games_finished}")
+    print(f"Dropped by server:   {stats.dropped}")
+
+    if stats.rtts:
+        rtts = sorted(rtt * 1000 for rtt in stats.rtts)
+        def percentile(p):
+            return rtts[min(len(rtts) - 1, int(p / 100 * len(rtts)))]
+        print(f"\nMove round-trip (ms): min {rtts[0]:.2f}  p50 {percentile(50):.2f}  "
+              f"p90 {percentile(90):.2f}  p99 {percentile(99):.2f}  max {rtts[-1]:.2f}")
+        counts = [0] * len(LATENCY_BUCKETS)
+        for rtt in rtts:
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if rtt <= bound:
+                    counts[i] += 1
+                    break
+        widest = max(counts)
+        for bound, count in zip(LATENCY_BUCKETS, counts):
+            label = "   inf" if bound == float('inf') else f"{bound:6g}"
+            bar = "#" * (40 * count // widest) if widest else ""
+            print(f"  <= {label} ms {count:8d} {bar}")
+
+    if sampler and sampler.samples:
+        start, peak, end = sampler.samples[0], max(sampler.samples), sampler.samples[-1]
+        print(f"\nServer RSS:          start {format_bytes(start)}, peak {format_bytes(peak)}, "
+              f"end {format_bytes(end)} (growth {format_bytes(end - start)})")
+    elif sampler:
+        print("\nServer RSS:          unavailable (needs /proc)")
+
+    if metrics:
+        print("\nServer metrics:")
+        for line in metrics.splitlines():
+            print(f"  {line}")
+
+
+def main():
+    # Bots never open a window or play sounds
+    init_headless()
+    parser = argparse.ArgumentParser(description="Load-test the checkers server with headless bots")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=5555)
+    parser.add_argument("--pairs", type=int, default=100, help="number of bot pairs (games)")
+    parser.add_argument("--rate", type=float, default=100, help="new connections per second")
+    parser.add_argument("--engine", choices=["random", "ai"], default="random")
+    parser.add_argument("--difficulty", choices=["easy", "medium", "hard"], default="easy")
+    parser.add_argument("--max-moves", type=int, default=200, help="moves per bot before a game is abandoned")
+    parser.add_argument("--slow-readers", type=int, default=0, help="number of bots that read slowly")
+    parser.add_argument("--slow-delay", type=float, default=0.05, help="seconds a slow reader sleeps after each read")
+    parser.add_argument("--timeout", type=float, default=300, help="give up on unfinished games after this many seconds")
+    parser.add_argument("--spawn-server", action="store_true", help="start server.py as a subprocess")
+    parser.add_argument("--server-pid", type=int, help="pid of an already running server to sample memory from")
+    parser.add_argument("--metrics-port", type=int, help="server metrics port, scraped into the report (a spawned server gets a free one by default)")
+    args = parser.parse_args()
+
+    addr = (args.host, args.port)
+    server_process = None
+    metrics_port = args.metrics_port
+    if args.spawn_server:
+        command = [sys.executable, "server.py", "--host", args.host, "--port", str(args.port),
+                   "--rooms", str(args.pairs), "--log-level", "WARNING"]
+        # The metrics endpoint doubles as the readiness probe, so the server always gets one
+        metrics_port = metrics_port or free_port()
+        command += ["--metrics-port", str(metrics_port)]
+        server_process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        if not wait_for_server(server_process, metrics_port):
+            print("[LOADTEST] Server did not come up")
+            server_process.kill()
+            return 1
+
+    pid = server_process.pid if server_process else args.server_pid
+    sampler = MemorySampler(pid) if pid else None
+    if sampler:
+        sampler.start()
+
+    stats = LoadStats()
+    bots = []
+    threads = []
+    print(f"[LOADTEST] Starting {args.pairs} pairs against {args.host}:{args.port} "
+          f"({args.engine} moves, {args.rate:g} conn/s)")
+    started = time.perf_counter()
+    for i in range(args.pairs * 2):
+        read_delay = args.slow_delay if i < args.slow_readers else 0
+        bot = BotClient(f"bot{i}", addr, stats, args.engine, args.difficulty, args.max_moves, read_delay)
+        thread = threading.Thread(target=bot.run)
+        thread.daemon = True
+        thread.start()
+        bots.append(bot)
+        threads.append(thread)
+        # Pace the ramp-up to the requested connection rate
+        delay = started + (i + 1) / args.rate - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+    deadline = started + args.timeout
+    for thread in threads:
+        thread.join(max(0, deadline - time.perf_counter()))
+    for bot in bots:
+        bot.close()
+    elapsed = time.perf_counter() - started
+
+    if sampler:
+        sampler.stop()
+    # Scraped before a spawned server is stopped below
+    metrics = fetch_metrics(metrics_port) if metrics_port else None
+    print_report(stats, elapsed, sampler, metrics)
+
+    if server_process:
+        server_process.terminate()
+        server_process.wait()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,12 @@
 import pygame
-from classes.constants import WIDTH, HEIGHT, SQUARE_SIZE, PIECE_LIGHT, PIECE_DARK, ROWS, COLS
+from classes.constants import WIDTH, HEIGHT, SQUARE_SIZE, PIECE_LIGHT, PIECE_DARK, ROWS, COLS, DRAW
 from classes.game import Game
 from classes.menu import MainMenu, PauseMenu
 from classes.ai import AIPlayer
+from classes.logger import get_logger
+from classes.network import Inbox
+
+log = get_logger("client")
 
 WIN = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption('Checkers')
@@ -28,6 +32,31 @@ def draw_text_with_background(text, font, text_color, background_color, surface,
     text_rect = text_surface.get_rect(center=(x + width // 2, y + height // 2))
     surface.blit(text_surface, text_rect)
 
+def apply_network_messages(game, messages):
+    """Apply messages drained from the inbox to the game, on the main thread"""
+    for message in messages:
+        if message["type"] == "game_state":
+            # Update game state from server; the turn goes first so the repetition
+            # history is restarted with the right side to move
+            if message["turn"] is not None:
+                game.turn = message["turn"]
+                log.debug("Updated turn to: %s", 'Red' if game.turn == PIECE_LIGHT else 'Black')
+            if message["board"] is not None:
+                game.set_board_state(message["board"])
+            # Update scores
+            game.black_score = message.get("black_score", game.black_score)
+            game.white_score = message.get("white_score", game.white_score)
+            log.debug("Updated scores: Black=%s, White=%s", game.black_score, game.white_score)
+
+        elif message["type"] == "game_started":
+            log.info("Game started notification received in main")
+
+def end_game(game, ai_player):
+    """Stop the background searches of a game that is over or being left"""
+    if ai_player is not None:
+        ai_player.stop_pondering()
+    game.close()
+
 def main():
     pygame.init()
     # Charger l'image de fond pour le menu de pause
@@ -49,55 +78,33 @@ def main():
     
     ai_player = None
     network = None
+    inbox = None
     
     if mode == "vsAI":
-        ai_player = AIPlayer(PIECE_LIGHT, ai_difficulty)
+        ai_player = AIPlayer(PIECE_LIGHT, ai_difficulty, ponder=True)
         # In vsAI, player controls PIECE_DARK, so enable move sound
         game.enable_move_sound = True
     elif mode == "online":
         network = ai_difficulty  # In online mode, this contains the network object
         player_name = player_difficulty  # In online mode, this contains player name
         # Use "master" as default difficulty for online mode to avoid invalid difficulty
-        game = Game(WIN, "master", show_help)  # Pass help choice here too
+        # Only local moves go through Game._move online, so those games are not recorded
+        game = Game(WIN, "master", show_help, record=False)  # Pass help choice here too
         # Enable move sound only for player's turn
         game.enable_move_sound = False  # Will be set dynamically in event loop
         
-        # Set up network callback
-        def handle_network_message(message):
-            nonlocal game
-            
-            if message["type"] == "game_state":
-                # Update game state from server
-                print(f"[CLIENT] Received game state update")
-                if message["board"] is not None:
-                    game.board.set_board_state(message["board"])
-                    print(f"[CLIENT] Updated board state")
-                if message["turn"] is not None:
-                    game.turn = message["turn"]
-                    print(f"[CLIENT] Updated turn to: {'Red' if game.turn == PIECE_LIGHT else 'Black'}")
-                # Update scores
-                game.black_score = message.get("black_score", game.black_score)
-                game.white_score = message.get("white_score", game.white_score)
-                print(f"[CLIENT] Updated scores: Black={game.black_score}, White={game.white_score}")
-                game.update()
-            
-            elif message["type"] == "game_started":
-                print(f"[CLIENT] Game started notification received in main")
-                # No need to do anything here, the menu already handled this
-                pass
-                
-            return None  # No special return value needed in main
-        
-        network.set_callback(handle_network_message)
+        # Messages arrive on the network thread; the frame loop applies them
+        inbox = Inbox()
+        network.set_callback(inbox.put)
         
         # For player 1 (host), send initial board state after starting
         if network.player_id == 1:
             # Wait a moment to ensure both players are ready
             pygame.time.delay(500)
             # Send initial board state
-            initial_board_state = game.board.get_board_state()
+            initial_board_state = game.get_board_state()
             network.send_move(initial_board_state, game.turn)
-            print(f"[CLIENT] Player 1 sent initial board state")
+            log.info("Player 1 sent initial board state")
     else:
         # In multiplayer, both players are human, so enable move sound
         game.enable_move_sound = True
@@ -108,6 +115,9 @@ def main():
     while run:
         clock.tick(60)
         
+        if mode == "online" and inbox is not None:
+            apply_network_messages(game, inbox.drain())
+        
         if mode == "vsAI" and game.turn == PIECE_LIGHT and not ai_thinking:
             ai_thinking = True
             ai_move_time = pygame.time.get_ticks()
@@ -118,9 +128,14 @@ def main():
 
         winner = game.winner()
         if winner is not None:
-            winner_text = f"Winner: {'White' if winner == PIECE_LIGHT else 'Black'}"
+            game.finish(winner)
+            if winner == DRAW:
+                winner_text = "Draw"
+            else:
+                winner_text = f"Winner: {'White' if winner == PIECE_LIGHT else 'Black'}"
             draw_text_with_background(winner_text, font, (255, 255, 255), (50, 50, 50), WIN, WIDTH // 4, 80, WIDTH // 2, 80)
             pygame.display.update()
+            end_game(game, ai_player)
             pygame.time.delay(3000)
             main_menu = MainMenu(WIN)
             mode, player_difficulty, ai_difficulty, show_help = main_menu.run()  # Récupérer mode, player_difficulty, ai_difficulty, show_help
@@ -130,28 +145,16 @@ def main():
                 game = Game(WIN, player_difficulty, show_help)  # Passer player_difficulty et show_help à Game
                 # Let Game class handle show_valid_moves based on difficulty
                 if mode == "vsAI":
-                    ai_player = AIPlayer(PIECE_LIGHT, ai_difficulty)
+                    ai_player = AIPlayer(PIECE_LIGHT, ai_difficulty, ponder=True)
                     game.enable_move_sound = True
                 elif mode == "online":
                     network = ai_difficulty
                     player_name = player_difficulty
-                    game = Game(WIN, "master", show_help)
+                    game = Game(WIN, "master", show_help, record=False)
                     game.enable_move_sound = False
                     
-                    # Set up network callback
-                    def handle_network_message(message):
-                        if message["type"] == "game_state":
-                            # Update game state from server
-                            if message["board"] is not None:
-                                game.board.set_board_state(message["board"])
-                            if message["turn"] is not None:
-                                game.turn = message["turn"]
-                            # Update scores
-                            game.black_score = message.get("black_score", game.black_score)
-                            game.white_score = message.get("white_score", game.white_score)
-                            game.update()
-                    
-                    network.set_callback(handle_network_message)
+                    inbox = Inbox()
+                    network.set_callback(inbox.put)
                 else:
                     ai_player = None
                     game.enable_move_sound = True
@@ -178,6 +181,7 @@ def main():
                     elif pause_result == "main_menu":
                         if network:
                             network.disconnect()
+                        end_game(game, ai_player)
                         main_menu = MainMenu(WIN)
                         mode, player_difficulty, ai_difficulty, show_help = main_menu.run()
                         if mode == "quit":
@@ -186,28 +190,16 @@ def main():
                             game = Game(WIN, player_difficulty, show_help)
                             # Let Game class handle show_valid_moves based on difficulty
                             if mode == "vsAI":
-                                ai_player = AIPlayer(PIECE_LIGHT, ai_difficulty)
+                                ai_player = AIPlayer(PIECE_LIGHT, ai_difficulty, ponder=True)
                                 game.enable_move_sound = True
                             elif mode == "online":
                                 network = ai_difficulty
                                 player_name = player_difficulty
-                                game = Game(WIN, "master", show_help)
+                                game = Game(WIN, "master", show_help, record=False)
                                 game.enable_move_sound = False
                                 
-                                # Set up network callback
-                                def handle_network_message(message):
-                                    if message["type"] == "game_state":
-                                        # Update game state from server
-                                        if message["board"] is not None:
-                                            game.board.set_board_state(message["board"])
-                                        if message["turn"] is not None:
-                                            game.turn = message["turn"]
-                                        # Update scores
-                                        game.black_score = message.get("black_score", game.black_score)
-                                        game.white_score = message.get("white_score", game.white_score)
-                                        game.update()
-                                
-                                network.set_callback(handle_network_message)
+                                inbox = Inbox()
+                                network.set_callback(inbox.put)
                             else:
                                 ai_player = None
                                 game.enable_move_sound = True
@@ -218,6 +210,8 @@ def main():
                 # Toggle valid moves display with 'V' key
                 elif event.key == pygame.K_v:
                     game.show_valid_moves = not game.show_valid_moves
+                elif event.key == pygame.K_a:
+                    game.toggle_analysis()
             
             if event.type == pygame.MOUSEBUTTONDOWN:
                 pos = pygame.mouse.get_pos()
@@ -234,6 +228,7 @@ def main():
                     elif pause_result == "main_menu":
                         if network:
                             network.disconnect()
+                        end_game(game, ai_player)
                         main_menu = MainMenu(WIN)
                         mode, player_difficulty, ai_difficulty, show_help = main_menu.run()
                         if mode == "quit":
@@ -242,28 +237,16 @@ def main():
                             game = Game(WIN, player_difficulty, show_help)
                             # Let Game class handle show_valid_moves based on difficulty
                             if mode == "vsAI":
-                                ai_player = AIPlayer(PIECE_LIGHT, ai_difficulty)
+                                ai_player = AIPlayer(PIECE_LIGHT, ai_difficulty, ponder=True)
                                 game.enable_move_sound = True
                             elif mode == "online":
                                 network = ai_difficulty
                                 player_name = player_difficulty
-                                game = Game(WIN, "master", show_help)
+                                game = Game(WIN, "master", show_help, record=False)
                                 game.enable_move_sound = False
                                 
-                                # Set up network callback
-                                def handle_network_message(message):
-                                    if message["type"] == "game_state":
-                                        # Update game state from server
-                                        if message["board"] is not None:
-                                            game.board.set_board_state(message["board"])
-                                        if message["turn"] is not None:
-                                            game.turn = message["turn"]
-                                        # Update scores
-                                        game.black_score = message.get("black_score", game.black_score)
-                                        game.white_score = message.get("white_score", game.white_score)
-                                        game.update()
-                                
-                                network.set_callback(handle_network_message)
+                                inbox = Inbox()
+                                network.set_callback(inbox.put)
                             else:
                                 ai_player = None
                                 game.enable_move_sound = True
@@ -293,11 +276,12 @@ def main():
                             ERROR_SOUND.play()
                         elif result == "move_made" and mode == "online":
                             # Send move to server
-                            print(f"[CLIENT] Sending move. Turn changing to: {'Red' if game.turn == PIECE_LIGHT else 'Black'}")
-                            network.send_move(game.board.get_board_state(), game.turn)
+                            log.debug("Sending move. Turn changing to: %s", 'Red' if game.turn == PIECE_LIGHT else 'Black')
+                            network.send_move(game.get_board_state(), game.turn)
 
         game.update()
     
+    end_game(game, ai_player)
     pygame.quit()
 
 if __name__ == "__main__":
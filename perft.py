@@ -0,0 +1,153 @@
+"""
+Move generator perft: counts the leaf nodes of the full move tree to a depth.
+
+Each entry of Board.get_valid_moves is one move, as in the AI's search, and the
+side to move alternates after every move (capture-chain shortcuts included, no
+mandatory capture). The counts check that move generation is unchanged and the
+nodes per second measure its speed.
+
+A regression corpus pins the exact move lists (destinations, order and captured
+pieces) of a set of positions, so a rewritten generator can be checked against
+the one that wrote it:
+
+    python perft.py --depth 7
+    python perft.py --depth 6 --fen "W:WK1,K3:BK30,K32"
+    python perft.py --write-corpus movegen_corpus.txt --positions 2000
+    python perft.py --check movegen_corpus.txt
+"""
+import argparse
+import hashlib
+import random
+import time
+
+from classes.board import Board
+from classes.constants import PIECE_DARK, PIECE_LIGHT
+from classes.headless import HeadlessGame
+from classes.position import SQUARES, from_fen, pack_key, key_to_fen, to_fen
+from classes.record import square_number
+
+
+def perft(board, color, depth):
+    if depth == 0:
+        return 1
+    opponent = PIECE_LIGHT if color == PIECE_DARK else PIECE_DARK
+    grid = board.board
+    nodes = 0
+    for piece in board.get_all_pieces(color):
+        moves = board.get_valid_moves(piece)
+        if depth == 1:
+            nodes += len(moves)
+            continue
+        row, col, king = piece.row, piece.col, piece.king
+        for (to_row, to_col), skipped in moves.items():
+            grid[row][col], grid[to_row][to_col] = 0, piece
+            piece.row, piece.col = to_row, to_col
+            if to_row in (0, len(grid) - 1):
+                piece.king = True
+            for captured in skipped:
+                grid[captured.row][captured.col] = 0
+            nodes += perft(board, opponent, depth - 1)
+            for captured in skipped:
+                grid[captured.row][captured.col] = captured
+            grid[to_row][to_col], grid[row][col] = 0, piece
+            piece.row, piece.col, piece.king = row, col, king
+    return nodes
+
+
+def move_list(board):
+    """Every move of both sides in generation order, as text: 9x18(14) captures 14"""
+    moves = []
+    for color in (PIECE_DARK, PIECE_LIGHT):
+        for piece in board.get_all_pieces(color):
+            start = square_number(piece.row, piece.col)
+            for (row, col), skipped in board.get_valid_moves(piece).items():
+                captured = ",".join(str(square_number(s.row, s.col)) for s in skipped)
+                moves.append(f"{start}{'x' if skipped else '-'}{square_number(row, col)}({captured})")
+    return " ".join(moves)
+
+
+def corpus_positions(count, seed):
+    """Half random-game positions, half crowded random placements rich in multi-jumps"""
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count // 2:
+        game = HeadlessGame()
+        for _ in range(rng.randint(0, 60)):
+            if not game.play_random(rng):
+                break
+        positions.append(to_fen(game.board, game.turn))
+    while len(positions) < count:
+        dark = light = kings = 0
+        for i in rng.sample(range(len(SQUARES)), rng.randint(8, 24)):
+            if rng.random() < 0.5:
+                dark |= 1 << i
+            else:
+                light |= 1 << i
+            if rng.random() < 0.3:
+                kings |= 1 << i
+        positions.append(key_to_fen(pack_key(dark, light, kings, rng.choice((PIECE_DARK, PIECE_LIGHT)))))
+    return positions
+
+
+def digest(board):
+    moves = move_list(board)
+    return hashlib.sha1(moves.encode()).hexdigest()[:16], moves.count(" ") + 1 if moves else 0
+
+
+def write_corpus(path, count, seed):
+    board = Board()
+    with open(path, "w") as f:
+        f.write("# FEN, move list digest, move count; written by perft.py --write-corpus\n")
+        for fen in corpus_positions(count, seed):
+            from_fen(board, fen)
+            f.write("%s %s %d\n" % (fen, *digest(board)))
+    print(f"Wrote {count} positions to {path}")
+
+
+def check_corpus(path):
+    board = Board()
+    checked = failed = 0
+    with open(path) as f:
+        for line in f:
+            if not line.strip() or line.startswith("#"):
+                continue
+            fen, expected, count = line.split()
+            from_fen(board, fen)
+            checked += 1
+            if digest(board) != (expected, int(count)):
+                failed += 1
+                if failed <= 10:
+                    print(f"MISMATCH {fen}: {move_list(board)}")
+    print(f"{checked} positions checked, {failed} mismatches")
+    return failed == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Count move-tree leaf nodes to each depth")
+    parser.add_argument("--depth", type=int, default=6)
+    parser.add_argument("--fen", help="start from this position instead of the initial one")
+    parser.add_argument("--write-corpus", metavar="FILE", help="record the move lists of random positions")
+    parser.add_argument("--positions", type=int, default=2000, help="positions in a new corpus")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--check", metavar="FILE", help="compare move generation against a corpus")
+    args = parser.parse_args()
+
+    if args.write_corpus:
+        write_corpus(args.write_corpus, args.positions, args.seed)
+        return
+    if args.check:
+        raise SystemExit(0 if check_corpus(args.check) else 1)
+
+    board = Board()
+    color = from_fen(board, args.fen) if args.fen else PIECE_DARK
+    print(f"{'depth':>5}{'nodes':>14}{'time s':>10}{'knps':>10}")
+    for depth in range(1, args.depth + 1):
+        started = time.perf_counter()
+        nodes = perft(board, color, depth)
+        elapsed = time.perf_counter() - started
+        knps = nodes / elapsed / 1000 if elapsed > 0 else 0
+        print(f"{depth:>5}{nodes:>14}{elapsed:>10.3f}{knps:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,92 @@
 import socket
 import threading
 import pickle
+import queue
 import time
 import sys
+import argparse
+import logging
+import secrets
 from classes.constants import PIECE_DARK
+from classes.logger import get_logger, set_level, sampled
+from classes.metrics import Metrics
+from classes.discovery import DiscoveryResponder, DISCOVERY_PORT
+from classes.network import drain_messages
 
-class CheckersServer:
-    def __init__(self, host='0.0.0.0', port=5555):
-        self.host = host
-        self.port = port
-        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.server.bind((self.host, self.port))
-        self.server.listen(2)
-        
-        self.clients = {}
+log = get_logger("server")
+
+# Seconds a dropped player's seat is kept for them to resume their session
+RESUME_GRACE = 30
+# Encoded messages a connection may have waiting before it is considered too slow
+WRITER_QUEUE_SIZE = 64
+# Seconds a closing connection gets to send its last queued replies
+FLUSH_TIMEOUT = 1.0
+
+class ClientWriter:
+    """Sends already-encoded messages to one connection from its own thread"""
+    def __init__(self, conn, addr, on_overflow=None, max_pending=WRITER_QUEUE_SIZE):
+        self.conn = conn
+        self.addr = addr
+        self.on_overflow = on_overflow
+        self.pending = queue.Queue(max_pending)
+        self.closed = False
+        self.thread = threading.Thread(target=self.run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def send(self, data):
+        """Queue bytes without blocking; a full queue disconnects the lagging client"""
+        if self.closed:
+            return False
+        try:
+            self.pending.put_nowait(data)
+            return True
+        except queue.Full:
+            log.warning("Dropping slow client %s (%d messages pending)", self.addr, self.pending.qsize())
+            if self.on_overflow:
+                self.on_overflow()
+            self.close()
+            return False
+
+    def run(self):
+        while True:
+            data = self.pending.get()
+            if data is None:
+                break
+            try:
+                self.conn.sendall(data)
+            except OSError:
+                self.close()
+                break
+
+    def finish(self, timeout=FLUSH_TIMEOUT):
+        """Close once the queued messages (a last resume_failed, say) are sent or timeout passes"""
+        if not self.closed:
+            try:
+                self.pending.put_nowait(None)
+                self.thread.join(timeout)
+            except queue.Full:
+                # A full queue means the client isn't reading; don't wait for it
+                pass
+        self.close()
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            # Unblocks both a stuck sendall here and the handler's recv
+            self.conn.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        try:
+            self.pending.put_nowait(None)
+        except queue.Full:
+            pass
+
+class Room:
+    def __init__(self, room_id):
+        self.room_id = room_id
         self.players = {}
         self.game_state = {
             "board": None,
@@ -23,152 +96,372 @@ class CheckersServer:
             "white_score": 0
         }
         self.player_count = 0
+        self.slots = set()
+        # Every game_state broadcast of the current game, numbered from 1
+        self.move_log = []
+        # Serialises move log appends, broadcasts and session resumes
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        """Reserve the lowest free player id in this room"""
+        player_id = 1
+        while player_id in self.slots:
+            player_id += 1
+        self.slots.add(player_id)
+        self.player_count += 1
+        return player_id
+
+    def release(self, player_id):
+        self.slots.discard(player_id)
+        self.player_count -= 1
+
+class CheckersServer:
+    def __init__(self, host='0.0.0.0', port=5555, max_rooms=1):
+        self.host = host
+        self.port = port
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server.bind((self.host, self.port))
+        self.server.listen(max(2, 2 * max_rooms))
+        
+        self.rooms = {}
+        self.next_room_id = 1
+        self.max_rooms = max_rooms
         self.max_players = 2
+        self.lock = threading.Lock()
+        self.metrics = Metrics()
+        self.sessions = {}
         
-        print(f"[SERVER] Server started on {host}:{port}")
+        log.info("Server started on %s:%s (%d room(s))", host, port, max_rooms)
+
+    def assign_slot(self):
+        """Find a room with a free seat, opening a new room if allowed"""
+        with self.lock:
+            for room in self.rooms.values():
+                # Games in progress are not joinable, only waiting rooms
+                if not room.game_state["started"] and room.player_count < self.max_players:
+                    return room, room.reserve()
+            
+            if len(self.rooms) >= self.max_rooms:
+                return None, None
+            
+            room = Room(self.next_room_id)
+            self.next_room_id += 1
+            self.rooms[room.room_id] = room
+            self.metrics.set("rooms_active", len(self.rooms))
+            return room, room.reserve()
+
+    def free_seats(self):
+        """Seats a new player could take now, for LAN discovery replies"""
+        with self.lock:
+            waiting = sum(self.max_players - room.player_count
+                          for room in self.rooms.values() if not room.game_state["started"])
+            return waiting + self.max_players * (self.max_rooms - len(self.rooms))
+
+    def release_slot(self, room, player_id):
+        with self.lock:
+            room.release(player_id)
+            # Drop empty rooms so long-running servers don't accumulate them
+            if room.player_count <= 0:
+                self.rooms.pop(room.room_id, None)
+                self.metrics.set("rooms_active", len(self.rooms))
+                self.metrics.forget(room=room.room_id)
         
-    def handle_client(self, conn, addr, player_id):
-        print(f"[SERVER] New connection from {addr}, assigned player_id: {player_id}")
+    def handle_client(self, conn, addr, room, player_id):
+        """Serve one connection. A None room means the server is full and only a resume is accepted"""
+        log.info("New connection from %s", addr, extra={"room": room and room.room_id, "player": player_id})
+        self.metrics.inc("connections_total")
+        self.metrics.add("connections_active", 1)
+        session = None
+        left = False
+        writer = ClientWriter(conn, addr, lambda: self.metrics.inc("slow_clients_dropped_total"))
         
         try:
-            # Send player ID to client
-            conn.send(str(player_id).encode())
-            
-            # Wait for player name
-            name = conn.recv(1024).decode()
-            self.players[player_id] = {"name": name, "conn": conn, "addr": addr}
+            # Send player ID to client (0 when there is no seat for a new player)
+            writer.send(str(player_id or 0).encode())
             
-            print(f"[SERVER] Player {player_id} registered as '{name}'")
-            
-            # Tell all clients about the players
-            self.broadcast_players()
+            # Wait for player name, or a request to resume a dropped session
+            hello = conn.recv(1024).decode()
+            if hello.startswith("RESUME "):
+                provisional = (room, player_id)
+                session = self.resume_session(conn, writer, hello)
+                if provisional[0] is not None:
+                    self.release_slot(*provisional)
+                if session is None:
+                    room = None
+                    return
+                room, player_id = session["room"], session["player_id"]
+            elif room is None:
+                return
+            else:
+                name = hello
+                room.players[player_id] = {"name": name, "conn": conn, "writer": writer, "addr": addr}
+                session = self.open_session(room, player_id, name)
+                
+                log.info("Player registered as '%s'", name, extra={"room": room.room_id, "player": player_id})
+                writer.send(pickle.dumps({"type": "session", "token": session["token"], "player_id": player_id}))
+                
+                # Tell all clients about the players
+                self.broadcast_players(room)
             
-            while True:
+            buffer = b""
+            while not left:
                 try:
                     data = conn.recv(4096)
                     if not data:
                         break
                     
-                    message = pickle.loads(data)
-                    print(f"[SERVER] Received message type: {message['type']} from player {player_id}")
-                    
-                    # Handle different message types
-                    if message["type"] == "start_game":
-                        print(f"[SERVER] Player {player_id} started the game")
-                        self.game_state["started"] = True
-                        # Initialize with default turn (black's turn)
-                        self.game_state["turn"] = PIECE_DARK
-                        # Broadcast to all clients that the game has started
-                        self.broadcast_game_started()
-                    
-                    elif message["type"] == "move":
-                        # Update game state with the move
-                        print(f"[SERVER] Received move from player {player_id}")
-                        self.game_state["board"] = message["board"]
-                        self.game_state["turn"] = message["turn"]
-                        # Update scores from board state
-                        self.game_state["black_score"] = message["board"].get("black_score", 0)
-                        self.game_state["white_score"] = message["board"].get("white_score", 0)
-                        self.broadcast_game_state()
+                    received_at = time.perf_counter()
+                    self.metrics.inc("bytes_in_total", len(data))
+                    # A read may hold several messages, or only part of a large one
+                    messages, buffer = drain_messages(buffer + data)
+                    for message in messages:
+                        left = self.handle_message(room, player_id, message)
+                        
+                        latency = time.perf_counter() - received_at
+                        self.metrics.inc("messages_total", type=message["type"])
+                        self.metrics.observe("handler_seconds", latency, type=message["type"])
+                        self.metrics.observe("room_handler_seconds", latency, room=room.room_id)
+                        if log.isEnabledFor(logging.DEBUG) and sampled("server.message"):
+                            log.debug("Handled message", extra={
+                                "room": room.room_id, "player": player_id, "msg_type": message["type"],
+                                "latency": latency})
+                        if left:
+                            break
                     
                 except Exception as e:
-                    print(f"[SERVER] Error receiving data from {addr}: {e}")
+                    log.warning("Error receiving data from %s: %s", addr, e,
+                                extra={"room": room.room_id, "player": player_id})
                     break
         
         except Exception as e:
-            print(f"[SERVER] Error handling client {addr}: {e}")
+            log.warning("Error handling client %s: %s", addr, e,
+                        extra={"room": room and room.room_id, "player": player_id})
         finally:
-            print(f"[SERVER] Connection from {addr} closed")
-            if player_id in self.players:
-                del self.players[player_id]
-                self.broadcast_players()
-            
-            self.player_count -= 1
+            log.info("Connection from %s closed", addr, extra={"room": room and room.room_id, "player": player_id})
+            self.metrics.add("connections_active", -1)
+            writer.finish()
             conn.close()
+            if room is not None:
+                self.drop_player(room, player_id, conn, session, left)
+
+    def handle_message(self, room, player_id, message):
+        """Apply one client message to its room. Returns True when the player is leaving"""
+        if message["type"] == "start_game":
+            log.info("Game started", extra={"room": room.room_id, "player": player_id})
+            room.game_state["started"] = True
+            # Initialize with default turn (black's turn)
+            room.game_state["turn"] = PIECE_DARK
+            room.move_log = []
+            # Broadcast to all clients that the game has started
+            self.broadcast_game_started(room)
+        
+        elif message["type"] == "move":
+            # Update game state with the move
+            room.game_state["board"] = message["board"]
+            room.game_state["turn"] = message["turn"]
+            # Update scores from board state
+            room.game_state["black_score"] = message["board"].get("black_score", 0)
+            room.game_state["white_score"] = message["board"].get("white_score", 0)
+            self.broadcast_game_state(room)
+        
+        elif message["type"] == "leave":
+            return True
+        return False
+
+    def drop_player(self, room, player_id, conn, session, left):
+        """Free a player's seat, or hold it for RESUME_GRACE seconds if they dropped mid-game"""
+        player = room.players.get(player_id)
+        if player is not None and player["conn"] is not conn:
+            # The session was already resumed on a newer connection
+            return
+        
+        if session is not None and not left and room.game_state["started"]:
+            player["conn"] = player["writer"] = None
+            session["suspended_at"] = time.time()
+            timer = threading.Timer(RESUME_GRACE, self.expire_session, args=(session["token"], session["suspended_at"]))
+            timer.daemon = True
+            timer.start()
+            log.info("Holding seat for %ss", RESUME_GRACE, extra={"room": room.room_id, "player": player_id})
+            return
+        
+        if session is not None:
+            self.sessions.pop(session["token"], None)
+        if player is not None:
+            del room.players[player_id]
+            self.broadcast_players(room)
+        self.release_slot(room, player_id)
+
+    def open_session(self, room, player_id, name):
+        session = {"token": secrets.token_hex(16), "room": room, "player_id": player_id,
+                   "name": name, "suspended_at": None}
+        with self.lock:
+            self.sessions[session["token"]] = session
+        return session
+
+    def expire_session(self, token, suspended_at):
+        session = self.sessions.get(token)
+        if session is None or session["suspended_at"] != suspended_at:
+            return
+        room, player_id = session["room"], session["player_id"]
+        log.info("Session expired", extra={"room": room.room_id, "player": player_id})
+        self.sessions.pop(token, None)
+        room.players.pop(player_id, None)
+        self.broadcast_players(room)
+        self.release_slot(room, player_id)
+
+    def resume_session(self, conn, writer, hello):
+        """Reattach a connection to its session and replay the moves it missed"""
+        try:
+            _, token, last_seq = hello.split()
+            last_seq = int(last_seq)
+        except ValueError:
+            token, last_seq = None, 0
+        
+        session = self.sessions.get(token)
+        player = session and session["room"].players.get(session["player_id"])
+        if player is None:
+            log.warning("Rejected resume with unknown session")
+            writer.send(pickle.dumps({"type": "resume_failed"}))
+            return None
+        
+        room = session["room"]
+        with room.lock:
+            old_writer = player["writer"]
+            player["conn"], player["writer"] = conn, writer
+            session["suspended_at"] = None
+            missed = [message for message in room.move_log if message["seq"] > last_seq]
+            writer.send(pickle.dumps({
+                "type": "resumed",
+                "player_id": session["player_id"],
+                "players": {pid: p["name"] for pid, p in room.players.items()},
+                "game_started": room.game_state["started"],
+                "moves": missed
+            }))
+        if old_writer is not None:
+            # A half-open connection the server had not noticed yet
+            old_writer.close()
+        
+        self.metrics.inc("sessions_resumed_total")
+        log.info("Session resumed, replayed %d move(s)", len(missed),
+                 extra={"room": room.room_id, "player": session["player_id"]})
+        return session
+
+    def send_to_room(self, room, data, msg_type):
+        """Queue one encoded message to every player in the room, recording fan-out time"""
+        started = time.perf_counter()
+        sent = 0
+        for player in list(room.players.values()):
+            writer = player["writer"]
+            if writer is None:
+                # Dropped player waiting to resume; they get the move log instead
+                continue
+            if writer.send(data):
+                sent += 1
+        self.metrics.inc("bytes_out_total", len(data) * sent, type=msg_type)
+        self.metrics.observe("broadcast_seconds", time.perf_counter() - started, type=msg_type)
     
-    def broadcast_players(self):
-        """Send the current players list to all connected clients"""
+    def broadcast_players(self, room):
+        """Send the current players list to all clients in the room"""
         players_info = {}
-        for pid, player in self.players.items():
+        for pid, player in room.players.items():
             players_info[pid] = player["name"]
         
         message = {
             "type": "players_update",
             "players": players_info,
-            "game_started": self.game_state["started"]
+            "game_started": room.game_state["started"]
         }
         
         data = pickle.dumps(message)
-        print(f"[SERVER] Broadcasting players update: {players_info}, game_started: {self.game_state['started']}")
-        for player in self.players.values():
-            try:
-                player["conn"].send(data)
-            except Exception as e:
-                print(f"[SERVER] Error sending player update to {player['addr']}: {e}")
+        log.debug("Broadcasting players update: %s, game_started: %s", players_info, room.game_state["started"],
+                  extra={"room": room.room_id, "msg_type": "players_update"})
+        self.send_to_room(room, data, "players_update")
     
-    def broadcast_game_started(self):
-        """Send a game start notification to all clients"""
+    def broadcast_game_started(self, room):
+        """Send a game start notification to all clients in the room"""
         message = {
             "type": "game_started",
             "started": True
         }
         
         data = pickle.dumps(message)
-        print(f"[SERVER] Broadcasting game start notification")
-        for player in self.players.values():
-            try:
-                player["conn"].send(data)
-            except Exception as e:
-                print(f"[SERVER] Error sending game start notification to {player['addr']}: {e}")
+        log.debug("Broadcasting game start notification", extra={"room": room.room_id, "msg_type": "game_started"})
+        self.send_to_room(room, data, "game_started")
     
-    def broadcast_game_state(self):
-        """Send the current game state to all connected clients"""
-        message = {
-            "type": "game_state",
-            "board": self.game_state["board"],
-            "turn": self.game_state["turn"],
-            "started": self.game_state["started"],
-            "black_score": self.game_state["black_score"],
-            "white_score": self.game_state["white_score"]
-        }
-        
-        data = pickle.dumps(message)
-        print(f"[SERVER] Broadcasting game state update. Turn: {self.game_state['turn']}, Scores: Black={self.game_state['black_score']}, White={self.game_state['white_score']}")
-        for player in self.players.values():
-            try:
-                player["conn"].send(data)
-            except Exception as e:
-                print(f"[SERVER] Error sending game state to {player['addr']}: {e}")
+    def broadcast_game_state(self, room):
+        """Send the current game state to all clients in the room"""
+        game_state = room.game_state
+        with room.lock:
+            message = {
+                "type": "game_state",
+                "seq": len(room.move_log) + 1,
+                "board": game_state["board"],
+                "turn": game_state["turn"],
+                "started": game_state["started"],
+                "black_score": game_state["black_score"],
+                "white_score": game_state["white_score"]
+            }
+            room.move_log.append(message)
+            
+            data = pickle.dumps(message)
+            if log.isEnabledFor(logging.DEBUG) and sampled("server.game_state"):
+                log.debug("Broadcasting game state update. Turn: %s, Scores: Black=%s, White=%s",
+                          game_state["turn"], game_state["black_score"], game_state["white_score"],
+                          extra={"room": room.room_id, "msg_type": "game_state"})
+            self.send_to_room(room, data, "game_state")
     
     def start(self):
-        print("[SERVER] Waiting for connections...")
+        log.info("Waiting for connections...")
         
         try:
             while True:
                 conn, addr = self.server.accept()
                 
-                if self.player_count >= self.max_players:
-                    print(f"[SERVER] Rejected connection from {addr}: Server full")
+                room, player_id = self.assign_slot()
+                if room is None and not any(s["suspended_at"] for s in list(self.sessions.values())):
+                    log.warning("Rejected connection from %s: Server full", addr)
+                    self.metrics.inc("connections_rejected_total")
                     conn.send("SERVER_FULL".encode())
                     conn.close()
                     continue
                 
-                self.player_count += 1
-                player_id = self.player_count
-                
                 # Start a new thread to handle this client
-                thread = threading.Thread(target=self.handle_client, args=(conn, addr, player_id))
+                thread = threading.Thread(target=self.handle_client, args=(conn, addr, room, player_id))
                 thread.daemon = True
                 thread.start()
                 
         except KeyboardInterrupt:
-            print("[SERVER] Server shutting down...")
+            log.info("Server shutting down...")
         except Exception as e:
-            print(f"[SERVER] An error occurred: {e}")
+            log.error("An error occurred: %s", e)
         finally:
             self.server.close()
-            print("[SERVER] Server closed")
+            log.info("Server closed")
 
 if __name__ == "__main__":
-    server = CheckersServer()
-    server.start()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Checkers game server")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5555)
+    parser.add_argument("--rooms", type=int, default=1, help="number of concurrent 2-player rooms")
+    parser.add_argument("--discovery-port", type=int, default=DISCOVERY_PORT, help="UDP port answering LAN discovery (0 to disable)")
+    parser.add_argument("--log-level", help="DEBUG, INFO, WARNING or ERROR (default: $CHECKERS_LOG_LEVEL or INFO)")
+    parser.add_argument("--metrics-port", type=int, help="serve metrics on http://127.0.0.1:PORT/metrics")
+    parser.add_argument("--metrics-file", help="periodically dump metrics to this file")
+    parser.add_argument("--metrics-interval", type=float, default=10, help="seconds between metrics dumps")
+    args = parser.parse_args()
+    if args.log_level:
+        set_level(args.log_level)
+
+    server = CheckersServer(args.host, args.port, args.rooms)
+    if args.discovery_port:
+        try:
+            DiscoveryResponder(args.port, server.free_seats, args.discovery_port)
+        except OSError as e:
+            log.warning("LAN discovery disabled: %s", e)
+    if args.metrics_port:
+        server.metrics.serve(args.metrics_port)
+        log.info("Metrics available on http://127.0.0.1:%s/metrics", args.metrics_port)
+    if args.metrics_file:
+        server.metrics.dump_periodically(args.metrics_file, args.metrics_interval)
+    server.start()
@@ -0,0 +1,229 @@
+"""
+Cross-checks the merged Board against the two Board classes it replaced.
+
+Before the merge classes/board.py (used by the network code) and classes/game.py
+each had their own Board. Both generated moves with the same recursive diagonal
+traversal and kept the same counters; the game-side copy also put the scores in
+network states. LegacyBoard below is that shared code without the drawing, and
+every test plays it against the real Board on the same positions.
+"""
+import random
+from types import SimpleNamespace
+
+import pygame
+import pytest
+
+from classes.board import Board
+from classes.constants import PIECE_DARK, PIECE_LIGHT, ROWS, COLS
+from classes.game import Game
+from classes.piece import Piece
+from classes.position import PositionHistory, from_fen
+
+CORPUS = "movegen_corpus.txt"
+
+
+class LegacyBoard:
+    """The rules of the pre-merge Board classes, built from a network state"""
+    def __init__(self, state):
+        self.board = [[0] * COLS for _ in range(ROWS)]
+        self.set_board_state(state)
+
+    def move(self, piece, row, col):
+        self.board[piece.row][piece.col], self.board[row][col] = self.board[row][col], self.board[piece.row][piece.col]
+        piece.move(row, col)
+        if row == ROWS - 1 or row == 0:
+            piece.make_king()
+            if piece.color == PIECE_LIGHT:
+                self.red_kings += 1
+            else:
+                self.white_kings += 1
+
+    def get_piece(self, row, col):
+        return self.board[row][col]
+
+    def remove(self, pieces):
+        for piece in pieces:
+            self.board[piece.row][piece.col] = 0
+            if piece.color == PIECE_LIGHT:
+                self.red_left -= 1
+            else:
+                self.white_left -= 1
+
+    def winner(self):
+        if self.red_left <= 0:
+            return PIECE_DARK
+        elif self.white_left <= 0:
+            return PIECE_LIGHT
+        return None
+
+    def get_valid_moves(self, piece):
+        moves = {}
+        left = piece.col - 1
+        right = piece.col + 1
+        row = piece.row
+        if piece.color == PIECE_DARK or piece.king:
+            moves.update(self._traverse(row - 1, max(row - 3, -1), -1, piece.color, left, -1))
+            moves.update(self._traverse(row - 1, max(row - 3, -1), -1, piece.color, right, 1))
+        if piece.color == PIECE_LIGHT or piece.king:
+            moves.update(self._traverse(row + 1, min(row + 3, ROWS), 1, piece.color, left, -1))
+            moves.update(self._traverse(row + 1, min(row + 3, ROWS), 1, piece.color, right, 1))
+        return moves
+
+    def _traverse(self, start, stop, step, color, col, side, skipped=[]):
+        """_traverse_left (side -1) and _traverse_right (side 1) of the old classes"""
+        moves = {}
+        last = []
+        for r in range(start, stop, step):
+            if col < 0 or col >= COLS:
+                break
+            current = self.board[r][col]
+            if current == 0:
+                if skipped and not last:
+                    break
+                elif skipped:
+                    moves[(r, col)] = last + skipped
+                else:
+                    moves[(r, col)] = last
+                if last:
+                    if step == -1:
+                        row = max(r - 3, 0)
+                    else:
+                        row = min(r + 3, ROWS)
+                    moves.update(self._traverse(r + step, row, step, color, col - 1, -1, skipped=last))
+                    moves.update(self._traverse(r + step, row, step, color, col + 1, 1, skipped=last))
+                break
+            elif current.color == color:
+                break
+            else:
+                last = [current]
+            col += side
+        return moves
+
+    def get_all_pieces(self, color):
+        return [piece for row in self.board for piece in row if piece != 0 and piece.color == color]
+
+    def get_board_state(self, scores=None):
+        """The network-side state, or the game-side one when given (black, white) scores"""
+        state = {
+            "board_pieces": [],
+            "red_left": self.red_left,
+            "white_left": self.white_left,
+            "red_kings": self.red_kings,
+            "white_kings": self.white_kings
+        }
+        if scores is not None:
+            state["black_score"], state["white_score"] = scores
+        for row in range(ROWS):
+            for col in range(COLS):
+                piece = self.board[row][col]
+                if piece != 0:
+                    state["board_pieces"].append(
+                        {"row": piece.row, "col": piece.col, "color": piece.color, "king": piece.king})
+        return state
+
+    def set_board_state(self, state):
+        for row in range(ROWS):
+            for col in range(COLS):
+                self.board[row][col] = 0
+        self.red_left = state["red_left"]
+        self.white_left = state["white_left"]
+        self.red_kings = state["red_kings"]
+        self.white_kings = state["white_kings"]
+        for piece_data in state["board_pieces"]:
+            piece = Piece(piece_data["row"], piece_data["col"], piece_data["color"])
+            if piece_data["king"]:
+                piece.make_king()
+            self.board[piece_data["row"]][piece_data["col"]] = piece
+
+
+def move_table(board):
+    """{(color, origin): {destination: [captured squares]}} for both sides, in order"""
+    table = {}
+    for color in (PIECE_DARK, PIECE_LIGHT):
+        for piece in board.get_all_pieces(color):
+            table[color, (piece.row, piece.col)] = [
+                (move, [(s.row, s.col) for s in skipped])
+                for move, skipped in board.get_valid_moves(piece).items()]
+    return table
+
+
+def corpus_boards():
+    with open(CORPUS) as f:
+        fens = [line.split()[0] for line in f if line.strip() and not line.startswith("#")]
+    for fen in fens:
+        board = Board()
+        from_fen(board, fen)
+        yield fen, board
+
+
+def test_moves_match_on_corpus():
+    checked = 0
+    for fen, board in corpus_boards():
+        legacy = LegacyBoard(board.get_board_state())
+        assert move_table(board) == move_table(legacy), fen
+        checked += 1
+    assert checked == 2000
+
+
+def test_board_state_round_trip():
+    for fen, board in corpus_boards():
+        state = board.get_board_state()
+        assert state == LegacyBoard(state).get_board_state(), fen
+        copy = Board()
+        copy.set_board_state(state)
+        assert copy.get_board_state() == state, fen
+        assert move_table(copy) == move_table(board), fen
+
+
+def test_game_state_carries_scores():
+    """Game adds the scores to the board's state, as the game-side Board used to"""
+    board = Board()
+    from_fen(board, "W:W18,K22,30:B5,9,K14")
+    game = SimpleNamespace(board=board, turn=PIECE_LIGHT, black_score=7, white_score=4,
+                           history=PositionHistory())
+    state = Game.get_board_state(game)
+    assert state == LegacyBoard(state).get_board_state(scores=(7, 4))
+
+    receiver = SimpleNamespace(board=Board(), turn=PIECE_LIGHT, black_score=0, white_score=0,
+                               history=PositionHistory())
+    Game.set_board_state(receiver, state)
+    assert (receiver.black_score, receiver.white_score) == (7, 4)
+    assert receiver.board.get_board_state() == board.get_board_state()
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_random_games_match(seed):
+    """Both boards play the same random game; moves, counters and winner agree every ply"""
+    rng = random.Random(seed)
+    board = Board()
+    legacy = LegacyBoard(board.get_board_state())
+    color = PIECE_DARK
+    for _ in range(300):
+        assert board.winner() == legacy.winner()
+        assert board.get_board_state() == legacy.get_board_state()
+        moves = move_table(board)
+        assert moves == move_table(legacy)
+        if board.winner() is not None:
+            break
+        choices = [(origin, move) for (side, origin), piece_moves in moves.items() if side == color
+                   for move, _ in piece_moves]
+        if not choices:
+            break
+        origin, move = rng.choice(choices)
+        for target in (board, legacy):
+            piece = target.get_piece(*origin)
+            skipped = target.get_valid_moves(piece)[move]
+            target.move(piece, *move)
+            if skipped:
+                target.remove(skipped)
+        color = PIECE_LIGHT if color == PIECE_DARK else PIECE_DARK
+
+
+def test_board_loads_no_assets(monkeypatch):
+    def refuse(*args, **kwargs):
+        raise AssertionError("Board() loaded an asset")
+    for module, name in ((pygame.image, "load"), (pygame.font, "Font"), (pygame.font, "SysFont"),
+                         (pygame.mixer, "Sound"), (pygame.transform, "scale")):
+        monkeypatch.setattr(module, name, refuse)
+    board = Board()
+    assert len(board.get_all_pieces(PIECE_DARK)) == len(board.get_all_pieces(PIECE_LIGHT)) == 12
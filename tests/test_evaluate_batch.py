@@ -0,0 +1,87 @@
+"""
+AIPlayer.evaluate_batch must score every position exactly as evaluate_board does.
+"""
+import random
+
+import numpy as np
+import pytest
+
+from classes.ai import AIPlayer
+from classes.board import Board
+from classes.constants import PIECE_DARK, PIECE_LIGHT
+from classes.features import decode_board, encode_board
+from classes.headless import HeadlessGame
+from classes.position import from_fen
+
+# Weights far from the defaults, so a term scored with the wrong sign or scale shows
+WEIGHTS = {"piece": 7, "king": 23, "center": -4, "edge": 11, "back_row": 5, "capture": 13}
+
+
+def random_positions(count, seed=0):
+    """Random placements of 2-24 men and kings on the playable squares"""
+    rng = np.random.default_rng(seed)
+    positions = np.zeros((count, 32), dtype=np.int8)
+    for position in positions:
+        squares = rng.choice(32, rng.integers(2, 25), replace=False)
+        position[squares] = rng.choice([1, 2, -1, -2], len(squares), p=[0.35, 0.15, 0.35, 0.15])
+    return positions
+
+
+def game_positions(games=20, seed=0):
+    """Every position of random self-play games from the start"""
+    rng = random.Random(seed)
+    positions = []
+    for _ in range(games):
+        game = HeadlessGame()
+        positions.append(encode_board(game.board))
+        while game.winner() is None and game.plies < 150 and game.play_random(rng):
+            positions.append(encode_board(game.board))
+    return np.array(positions)
+
+
+def multi_jump_positions():
+    """Positions where some piece can jump two or more pieces in one move"""
+    positions = []
+    board = Board()
+    for fen in ("B:W14,15,22,23,K7:B26,K30,9", "W:W3,K12:B7,8,15,16,24,K23",
+                "B:W6,7,14,15,K22,23:B19,K27,28", "W:W2,K32:BK1,8,K9,18,K25,27,28"):
+        from_fen(board, fen)
+        positions.append(encode_board(board))
+    positions = np.array(positions)
+    return np.concatenate([positions, random_positions(3000, seed=1)])
+
+
+def has_multi_jump(board):
+    return any(len(landings) > 1
+               for color in (PIECE_DARK, PIECE_LIGHT)
+               for piece in board.get_all_pieces(color)
+               for _, landings, _ in board.capture_paths(piece))
+
+
+def scalar_scores(ai, positions):
+    board = Board()
+    return np.array([ai.evaluate_board(decode_board(position, board)) for position in positions])
+
+
+@pytest.mark.parametrize("color", [PIECE_DARK, PIECE_LIGHT])
+@pytest.mark.parametrize("weights", [None, WEIGHTS])
+@pytest.mark.parametrize("positions", [random_positions(2000), game_positions(), multi_jump_positions()],
+                         ids=["random", "games", "multi_jump"])
+def test_batch_equals_scalar(positions, color, weights):
+    ai = AIPlayer(color, weights=weights)
+    np.testing.assert_array_equal(ai.evaluate_batch(positions), scalar_scores(ai, positions))
+
+
+def test_multi_jump_set_has_chains():
+    board = Board()
+    for position in multi_jump_positions()[:4]:
+        assert has_multi_jump(decode_board(position, board))
+    chains = sum(has_multi_jump(decode_board(position, board)) for position in multi_jump_positions())
+    assert chains >= 100
+
+
+def test_single_position():
+    board = Board()
+    from_fen(board, "B:W14,15,22,23,K7:B26,K30,9")
+    ai = AIPlayer(PIECE_LIGHT)
+    assert ai.evaluate_batch(encode_board(board)).tolist() == [ai.evaluate_board(board)]
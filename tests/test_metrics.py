@@ -0,0 +1,24 @@
+from classes.metrics import Metrics
+
+
+def test_forget_folds_room_series_into_totals():
+    metrics = Metrics()
+    for room, latency in ((1, 0.001), (1, 0.002), (2, 0.3)):
+        metrics.observe("room_handler_seconds", latency, room=room)
+        metrics.inc("room_messages_total", room=room)
+    metrics.set("room_players", 2, room=1)
+
+    metrics.forget(room=1)
+    text = metrics.render()
+    assert 'room="1"' not in text
+    assert 'checkers_room_handler_seconds_count{room="2"} 1' in text
+    assert "checkers_room_handler_seconds_count 2" in text
+    assert "checkers_room_handler_seconds_sum 0.003000" in text
+    assert "checkers_room_messages_total 2" in text
+    assert "room_players" not in text
+
+    metrics.forget(room=2)
+    text = metrics.render()
+    assert "checkers_room_handler_seconds_count 3" in text
+    assert 'checkers_room_handler_seconds_bucket{le="+Inf"} 3' in text
+    assert "checkers_room_messages_total 3" in text
@@ -0,0 +1,37 @@
+"""
+FEN parsing and the 12-byte position keys.
+"""
+import pytest
+
+from classes.board import Board
+from classes.constants import PIECE_DARK, PIECE_LIGHT
+from classes.position import fen_to_key, from_fen, key_to_fen, position_key, unpack_key
+
+
+@pytest.mark.parametrize("fen", ["W:W18,K22,30:B5,9,K14", "B:W21-32:B1-12", "W:W13-32:B1-4"])
+def test_fen_round_trip(fen):
+    board = Board()
+    turn = from_fen(board, fen)
+    assert turn == (PIECE_LIGHT if fen[0] == "W" else PIECE_DARK)
+    key = position_key(board, turn)
+    assert key == fen_to_key(fen)
+    assert fen_to_key(key_to_fen(key)) == key
+
+
+def test_too_many_pieces_rejected():
+    """With 25 pieces only 7 squares are empty, not enough to carry light to move"""
+    with pytest.raises(ValueError):
+        fen_to_key("W:W14-32:B1-6")
+    with pytest.raises(ValueError):
+        from_fen(Board(), "B:W14-32:B1-6")
+
+
+@pytest.mark.parametrize("fen", ["B:W21-32:B1-12,5", "B:W12,21-32:B1-12", "W:W20,K20:B1"])
+def test_duplicate_squares_rejected(fen):
+    with pytest.raises(ValueError):
+        fen_to_key(fen)
+
+
+def test_turn_survives_full_board():
+    """24 pieces still leave room for the side to move"""
+    assert unpack_key(fen_to_key("W:W13-32:B1-4"))[3] == PIECE_LIGHT
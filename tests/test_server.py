@@ -0,0 +1,136 @@
+"""
+Server tests against a real CheckersServer on a loopback port.
+
+The slow-reader test fills one connection's socket buffers and writer queue
+by never reading from it, while its room-mate keeps reading, and checks that
+only the staller is dropped.
+"""
+import pickle
+import socket
+import threading
+import time
+
+import pytest
+
+from classes.network import drain_messages
+import server as server_module
+from server import CheckersServer, WRITER_QUEUE_SIZE
+
+# Each move carries this much padding, so a stalled socket fills within a few hundred moves
+PADDING = 64 * 1024
+
+
+@pytest.fixture
+def server():
+    server = CheckersServer("127.0.0.1", 0)
+    thread = threading.Thread(target=server.start)
+    thread.daemon = True
+    thread.start()
+    yield server
+    server.server.close()
+
+
+def connect(server, rcvbuf=None):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    if rcvbuf:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+    sock.settimeout(10)
+    sock.connect(server.server.getsockname())
+    return sock
+
+
+def wait_for(condition, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class Reader:
+    """Reads a connection on its own thread and keeps every message"""
+    def __init__(self, sock):
+        self.sock = sock
+        self.greeting = sock.recv(1).decode()
+        self.messages = []
+        self.closed = False
+        self.thread = threading.Thread(target=self.run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def run(self):
+        buffer = b""
+        try:
+            while True:
+                data = self.sock.recv(65536)
+                if not data:
+                    break
+                messages, buffer = drain_messages(buffer + data)
+                self.messages.extend(messages)
+        except OSError:
+            pass
+        self.closed = True
+
+    def of_type(self, msg_type):
+        return [message for message in self.messages if message["type"] == msg_type]
+
+
+def test_slow_reader_is_dropped_and_peer_keeps_receiving(server):
+    staller = connect(server, rcvbuf=4096)
+    staller.sendall(b"staller")
+    peer = connect(server)
+    reader = Reader(peer)
+    assert reader.greeting == "2"
+    peer.sendall(b"peer")
+    assert wait_for(lambda: len(server.rooms[1].players) == 2)
+
+    def move(i):
+        board = {"move": i, "padding": "x" * PADDING}
+        peer.sendall(pickle.dumps({"type": "move", "board": board, "turn": i % 2}))
+
+    # Enough moves to fill the staller's kernel buffers and then its writer queue
+    sent = 0
+    while server.metrics.counters.get(("slow_clients_dropped_total", ()), 0) == 0:
+        assert sent < 2000, "the stalled client was never dropped"
+        move(sent)
+        sent += 1
+        assert wait_for(lambda: len(reader.of_type("game_state")) == sent)
+    assert sent > WRITER_QUEUE_SIZE
+    assert server.metrics.counters[("slow_clients_dropped_total", ())] == 1
+
+    # The staller's seat is freed and the peer is told
+    assert wait_for(lambda: list(server.rooms[1].players) == [2])
+    assert wait_for(lambda: list(reader.of_type("players_update")[-1]["players"]) == [2])
+
+    # The peer still gets every update, in order
+    for i in range(sent, sent + 20):
+        move(i)
+    assert wait_for(lambda: len(reader.of_type("game_state")) == sent + 20)
+    seqs = [message["seq"] for message in reader.of_type("game_state")]
+    assert seqs == list(range(1, sent + 21))
+    assert not reader.closed
+
+    staller.close()
+    peer.close()
+
+
+def test_last_reply_is_sent_before_close(server, monkeypatch):
+    """A rejected resume gets its resume_failed before the server hangs up, even
+    when the writer thread is still behind as the handler finishes"""
+    run = server_module.ClientWriter.run
+    def late_run(writer):
+        get = writer.pending.get
+        def late_get():
+            data = get()
+            time.sleep(0.2)
+            return data
+        writer.pending.get = late_get
+        run(writer)
+    monkeypatch.setattr(server_module.ClientWriter, "run", late_run)
+    sock = connect(server)
+    reader = Reader(sock)
+    sock.sendall(b"RESUME unknown-token 0")
+    assert wait_for(lambda: reader.closed)
+    assert [message["type"] for message in reader.messages] == ["resume_failed"]
+    sock.close()
@@ -0,0 +1,196 @@
+"""
+Headless self-play tournament between AIPlayer configurations.
+
+Plays a round robin in parallel worker processes without a display. Every
+pairing plays each randomised opening twice with colours swapped, then the
+runner reports win/draw/loss, an Elo estimate with a 95% confidence
+interval and the average time per move for every engine.
+
+    python tournament.py easy medium hard --games 200
+    python tournament.py medium "medium,depth=4" --games 1000 --workers 8
+"""
+import argparse
+import csv
+import math
+import multiprocessing
+import random
+import time
+from itertools import combinations
+
+from classes.constants import PIECE_DARK, PIECE_LIGHT
+from classes.ai import AIPlayer
+from classes.headless import HeadlessGame, init_headless
+
+
+def parse_engine(spec):
+    """'medium', 'medium,depth=4', 'hard,search=alphabeta', 'hard,lmr=off' or 'hard,weights=weights.json' -> AIPlayer keyword arguments"""
+    difficulty, *options = spec.split(",")
+    kwargs = {"difficulty": difficulty}
+    for option in options:
+        key, _, value = option.partition("=")
+        if key == "depth":
+            kwargs["depth"] = int(value)
+        elif key == "weights":
+            kwargs["weights"] = value
+        elif key == "search":
+            kwargs["search"] = value
+        elif key == "lmr":
+            kwargs["lmr"] = value
+        else:
+            raise ValueError(f"Unknown engine option '{key}' in '{spec}'")
+    return kwargs
+
+
+def play_game(task):
+    """Play one game in a worker process and return its record"""
+    game_id, dark_spec, light_spec, seed, random_plies, max_plies = task
+    rng = random.Random(seed)
+    game = HeadlessGame()
+    players = {
+        PIECE_DARK: AIPlayer(PIECE_DARK, **parse_engine(dark_spec)),
+        PIECE_LIGHT: AIPlayer(PIECE_LIGHT, **parse_engine(light_spec)),
+    }
+    think_time = {PIECE_DARK: 0.0, PIECE_LIGHT: 0.0}
+    moves = {PIECE_DARK: 0, PIECE_LIGHT: 0}
+
+    # Randomised opening, identical for both colour assignments of a pairing
+    for _ in range(random_plies):
+        if not game.play_random(rng):
+            break
+
+    winner = None
+    while game.plies < max_plies:
+        winner = game.winner()
+        if winner is not None:
+            break
+        color = game.turn
+        started = time.perf_counter()
+        best_move = players[color].choose_move(game)
+        think_time[color] += time.perf_counter() - started
+        if best_move is None:
+            # The side to move is blocked and loses
+            winner = PIECE_LIGHT if color == PIECE_DARK else PIECE_DARK
+            break
+        piece_pos, move = best_move
+        skipped = game.board.get_valid_moves(game.board.get_piece(*piece_pos))[move]
+        game.play(piece_pos, move, skipped)
+        moves[color] += 1
+    else:
+        winner = game.winner()
+
+    return {
+        "game": game_id,
+        "dark": dark_spec,
+        "light": light_spec,
+        "result": "dark" if winner == PIECE_DARK else "light" if winner == PIECE_LIGHT else "draw",
+        "plies": game.plies,
+        "dark_time": think_time[PIECE_DARK],
+        "light_time": think_time[PIECE_LIGHT],
+        "dark_moves": moves[PIECE_DARK],
+        "light_moves": moves[PIECE_LIGHT],
+    }
+
+
+def elo_from_score(score):
+    score = min(max(score, 1e-6), 1 - 1e-6)
+    return -400 * math.log10(1 / score - 1)
+
+
+class EngineStats:
+    def __init__(self, spec):
+        self.spec = spec
+        self.wins = self.draws = self.losses = 0
+        self.scores = []
+        self.time = 0.0
+        self.moves = 0
+
+    def add(self, score, think_time, moves):
+        if score == 1:
+            self.wins += 1
+        elif score == 0:
+            self.losses += 1
+        else:
+            self.draws += 1
+        self.scores.append(score)
+        self.time += think_time
+        self.moves += moves
+
+    def elo(self):
+        """Elo against the rest of the field, with a 95% confidence interval"""
+        n = len(self.scores)
+        mean = sum(self.scores) / n
+        variance = sum((s - mean) ** 2 for s in self.scores) / max(1, n - 1)
+        margin = 1.96 * math.sqrt(variance / n)
+        return elo_from_score(mean), elo_from_score(mean - margin), elo_from_score(mean + margin)
+
+
+def build_tasks(specs, games, random_plies, max_plies, seed):
+    rng = random.Random(seed)
+    tasks = []
+    for a, b in combinations(specs, 2):
+        for _ in range(max(1, games // 2)):
+            opening_seed = rng.randrange(2 ** 32)
+            tasks.append((len(tasks), a, b, opening_seed, random_plies, max_plies))
+            tasks.append((len(tasks), b, a, opening_seed, random_plies, max_plies))
+    return tasks
+
+
+def print_report(specs, records, elapsed):
+    stats = {spec: EngineStats(spec) for spec in specs}
+    for record in records:
+        dark_score = {"dark": 1, "light": 0, "draw": 0.5}[record["result"]]
+        stats[record["dark"]].add(dark_score, record["dark_time"], record["dark_moves"])
+        stats[record["light"]].add(1 - dark_score, record["light_time"], record["light_moves"])
+
+    print(f"\n{len(records)} games in {elapsed:.1f}s\n")
+    print(f"{'engine':<24}{'games':>7}{'W':>7}{'D':>7}{'L':>7}{'score':>8}{'elo':>8}{'95% CI':>18}{'ms/move':>10}")
+    for spec in sorted(specs, key=lambda s: -stats[s].elo()[0] if stats[s].scores else 0):
+        s = stats[spec]
+        if not s.scores:
+            continue
+        elo, low, high = s.elo()
+        score = sum(s.scores) / len(s.scores)
+        ms_per_move = 1000 * s.time / s.moves if s.moves else 0
+        print(f"{spec:<24}{len(s.scores):>7}{s.wins:>7}{s.draws:>7}{s.losses:>7}{score:>8.3f}"
+              f"{elo:>+8.0f}{f'[{low:+.0f}, {high:+.0f}]':>18}{ms_per_move:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless AI-vs-AI tournament")
+    parser.add_argument("engines", nargs="+", help="engine specs, e.g. easy medium 'hard,depth=6'")
+    parser.add_argument("--games", type=int, default=100, help="games per pairing (half with each colour)")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--random-plies", type=int, default=4, help="random opening moves before the engines take over")
+    parser.add_argument("--max-plies", type=int, default=200, help="adjudicate a draw after this many plies")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write one CSV row per game to this file")
+    args = parser.parse_args()
+
+    if len(set(args.engines)) < 2:
+        parser.error("need at least two different engines")
+    for spec in args.engines:
+        parse_engine(spec)
+
+    tasks = build_tasks(args.engines, args.games, args.random_plies, args.max_plies, args.seed)
+    print(f"[TOURNAMENT] {len(tasks)} games across {args.workers} worker(s)")
+
+    started = time.perf_counter()
+    records = []
+    with multiprocessing.Pool(args.workers, initializer=init_headless) as pool:
+        for record in pool.imap_unordered(play_game, tasks):
+            records.append(record)
+            if len(records) % 50 == 0:
+                print(f"[TOURNAMENT] {len(records)}/{len(tasks)} games played")
+    elapsed = time.perf_counter() - started
+
+    print_report(args.engines, records, elapsed)
+
+    if args.output:
+        with open(args.output, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(records[0].keys()))
+            writer.writeheader()
+            writer.writerows(sorted(records, key=lambda r: r["game"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Texel-style tuning of the AIPlayer evaluation weights (requires NumPy).
+
+1. Generate a corpus of self-play positions labelled with the game result:
+       python tune.py generate --games 5000 --out corpus.npz
+2. Fit the weights by batched logistic regression and write a weights file:
+       python tune.py fit corpus.npz --out weights.json
+3. Use them:  AIPlayer(color, "hard", weights="weights.json")
+   or compare: python tournament.py medium "medium,weights=weights.json"
+
+`python tune.py check corpus.npz` verifies AIPlayer.evaluate_batch against
+the scalar evaluate_board and reports the throughput of both.
+"""
+import argparse
+import json
+import multiprocessing
+import random
+import time
+
+import numpy as np
+
+from classes.constants import PIECE_DARK, PIECE_LIGHT
+from classes.ai import AIPlayer, DEFAULT_WEIGHTS
+from classes.features import FEATURES, decode_board, encode_board, extract_features
+from classes.headless import HeadlessGame, init_headless
+
+
+def play_selfplay_game(task):
+    """Play one self-play game; returns its encoded positions and the result for dark"""
+    seed, depth, random_plies, epsilon, max_plies = task
+    rng = random.Random(seed)
+    game = HeadlessGame()
+    players = {color: AIPlayer(color, depth=depth) for color in (PIECE_DARK, PIECE_LIGHT)}
+    positions = []
+
+    while game.plies < max_plies and game.winner() is None:
+        if game.plies >= random_plies:
+            positions.append(encode_board(game.board))
+        if game.plies < random_plies or rng.random() < epsilon:
+            if not game.play_random(rng):
+                break
+            continue
+        best_move = players[game.turn].choose_move(game)
+        if best_move is None:
+            break
+        piece_pos, move = best_move
+        skipped = game.board.get_valid_moves(game.board.get_piece(*piece_pos))[move]
+        game.play(piece_pos, move, skipped)
+
+    winner = game.winner()
+    if winner is None and game.plies < max_plies:
+        # The side to move is blocked and loses
+        winner = PIECE_LIGHT if game.turn == PIECE_DARK else PIECE_DARK
+    result = 1.0 if winner == PIECE_DARK else 0.0 if winner == PIECE_LIGHT else 0.5
+    return positions, result
+
+
+def generate(args):
+    rng = random.Random(args.seed)
+    tasks = [(rng.randrange(2 ** 32), args.depth, args.random_plies, args.epsilon, args.max_plies)
+             for _ in range(args.games)]
+    all_positions, all_results = [], []
+    started = time.perf_counter()
+    with multiprocessing.Pool(args.workers, initializer=init_headless) as pool:
+        for i, (positions, result) in enumerate(pool.imap_unordered(play_selfplay_game, tasks, chunksize=4), 1):
+            all_positions.extend(positions)
+            all_results.extend([result] * len(positions))
+            if i % 100 == 0:
+                print(f"[TUNE] {i}/{len(tasks)} games, {len(all_positions)} positions")
+
+    positions = np.array(all_positions, dtype=np.int8).reshape(-1, 32)
+    results = np.array(all_results, dtype=np.float32)
+    np.savez_compressed(args.out, positions=positions, results=results)
+    print(f"[TUNE] Wrote {len(positions)} positions from {len(tasks)} games to {args.out} "
+          f"in {time.perf_counter() - started:.1f}s")
+
+
+def sigmoid(z):
+    return 1 / (1 + np.exp(-z))
+
+
+def fit_weights(features, results, epochs=20, batch_size=4096, learning_rate=0.5, l2=1e-4, seed=0):
+    """Mini-batch logistic regression of the result on the features; returns the logit weights"""
+    # Standardise the columns so one learning rate suits every feature
+    scale = features.std(axis=0)
+    scale[scale == 0] = 1
+    x = features / scale
+    w = np.zeros(x.shape[1])
+    rng = np.random.default_rng(seed)
+
+    for epoch in range(epochs):
+        order = rng.permutation(len(x))
+        for start in range(0, len(x), batch_size):
+            batch = order[start:start + batch_size]
+            error = sigmoid(x[batch] @ w) - results[batch]
+            w -= learning_rate * (x[batch].T @ error / len(batch) + l2 * w)
+        p = np.clip(sigmoid(x @ w), 1e-7, 1 - 1e-7)
+        loss = -np.mean(results * np.log(p) + (1 - results) * np.log(1 - p))
+        print(f"[TUNE] epoch {epoch + 1:3d}  log loss {loss:.5f}")
+    return w / scale
+
+
+def fit(args):
+    corpus = np.load(args.corpus)
+    started = time.perf_counter()
+    positions = corpus["positions"]
+    # The engine scores a position from its own side (the capture term counts only its own
+    # captures), so every position is fitted once as dark sees it and once as light does
+    features = np.vstack([extract_features(positions, color)
+                          for color in (PIECE_DARK, PIECE_LIGHT)]).astype(np.float64)
+    results = corpus["results"].astype(np.float64)
+    results = np.concatenate([results, 1 - results])
+    print(f"[TUNE] Extracted {features.shape[1]} features from {len(positions)} positions, both sides, "
+          f"in {time.perf_counter() - started:.2f}s")
+
+    w = fit_weights(features, results, args.epochs, args.batch_size, args.learning_rate, args.l2)
+    if w[0] <= 0:
+        raise SystemExit(f"[TUNE] The fitted piece weight is {w[0]:.4g}, so the weights can't be scaled to "
+                         f"piece = {DEFAULT_WEIGHTS['piece']}; the corpus is too small or its results "
+                         f"carry no signal. {args.out} was not written.")
+    # Rescale so a piece is worth the same as in the hand-tuned evaluation
+    factor = DEFAULT_WEIGHTS["piece"] / w[0]
+    weights = {term: round(float(value * factor), 2) for term, value in zip(FEATURES, w)}
+
+    with open(args.out, "w") as f:
+        json.dump(weights, f, indent=2)
+    print(f"[TUNE] Wrote {args.out}:")
+    for term in FEATURES:
+        print(f"  {term:<10}{DEFAULT_WEIGHTS[term]:>8} -> {weights[term]:>8}")
+
+
+def check(args):
+    """Compare AIPlayer.evaluate_batch with evaluate_board on a sample of a corpus"""
+    positions = np.load(args.corpus)["positions"]
+    rng = np.random.default_rng(args.seed)
+    sample = positions[rng.choice(len(positions), min(args.sample, len(positions)), replace=False)]
+    board = HeadlessGame().board
+
+    for color in (PIECE_DARK, PIECE_LIGHT):
+        ai = AIPlayer(color, weights=args.weights)
+        started = time.perf_counter()
+        batch = ai.evaluate_batch(sample)
+        batch_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        scalar = np.array([ai.evaluate_board(decode_board(position, board)) for position in sample])
+        scalar_time = time.perf_counter() - started
+
+        mismatches = np.flatnonzero(~np.isclose(batch, scalar))
+        name = "dark" if color == PIECE_DARK else "light"
+        print(f"[TUNE] {name}: {len(sample)} positions, batch {len(sample) / batch_time:,.0f}/s, "
+              f"scalar {len(sample) / scalar_time:,.0f}/s, {len(mismatches)} mismatch(es)")
+        if len(mismatches):
+            i = mismatches[0]
+            raise SystemExit(f"position {i}: batch {batch[i]} != scalar {scalar[i]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune evaluation weights from self-play")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    gen = commands.add_parser("generate", help="play self-play games and save labelled positions")
+    gen.add_argument("--games", type=int, default=1000)
+    gen.add_argument("--depth", type=int, default=2, help="search depth of the self-play engines")
+    gen.add_argument("--random-plies", type=int, default=6, help="random opening moves (not recorded)")
+    gen.add_argument("--epsilon", type=float, default=0.1, help="chance of a random move after the opening")
+    gen.add_argument("--max-plies", type=int, default=200, help="adjudicate a draw after this many plies")
+    gen.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    gen.add_argument("--seed", type=int, default=0)
+    gen.add_argument("--out", default="corpus.npz")
+
+    fit_parser = commands.add_parser("fit", help="fit weights to a corpus and write a weights file")
+    fit_parser.add_argument("corpus")
+    fit_parser.add_argument("--epochs", type=int, default=20)
+    fit_parser.add_argument("--batch-size", type=int, default=4096)
+    fit_parser.add_argument("--learning-rate", type=float, default=0.5)
+    fit_parser.add_argument("--l2", type=float, default=1e-4)
+    fit_parser.add_argument("--out", default="weights.json")
+
+    check_parser = commands.add_parser("check", help="verify batch evaluation against the scalar one")
+    check_parser.add_argument("corpus")
+    check_parser.add_argument("--sample", type=int, default=5000)
+    check_parser.add_argument("--weights", help="weights file to evaluate with (default: built-in)")
+    check_parser.add_argument("--seed", type=int, default=0)
+
+    args = parser.parse_args()
+    if args.command == "generate":
+        generate(args)
+    elif args.command == "check":
+        init_headless()
+        check(args)
+    else:
+        fit(args)
+
+
+if __name__ == "__main__":
+    main()